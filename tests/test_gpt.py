@@ -10,7 +10,7 @@ from tools.gpt import gpt  # type: ignore
 
 
 class TestGPT(unittest.TestCase):
-    @patch("gpt.get_api_key")
+    @patch("tools.gpt.gpt.get_api_key")
     @patch("openai.OpenAI")
     def test_generate_text(self, mock_openai, mock_get_api_key):
         # Setup mock
@@ -19,13 +19,14 @@ class TestGPT(unittest.TestCase):
         mock_client = MagicMock()
         mock_openai.return_value = mock_client
 
-        mock_response = MagicMock()
-        mock_choice = MagicMock()
-        mock_message = MagicMock()
-        mock_message.content = "This is a mock response from GPT."
-        mock_choice.message = mock_message
-        mock_response.choices = [mock_choice]
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_chunks = []
+        for content in ["This is a mock ", None, "response from GPT."]:
+            mock_chunk = MagicMock()
+            mock_choice = MagicMock()
+            mock_choice.delta.content = content
+            mock_chunk.choices = [mock_choice]
+            mock_chunks.append(mock_chunk)
+        mock_client.chat.completions.create.return_value = iter(mock_chunks)
 
         # Test the function
         result = gpt.generate_text("Test prompt", "gpt-3.5-turbo", 0.7, 500)
@@ -34,11 +35,13 @@ class TestGPT(unittest.TestCase):
         self.assertEqual(result, "This is a mock response from GPT.")
         mock_openai.assert_called_once_with(api_key="fake-api-key")
         mock_client.chat.completions.create.assert_called_once()
+        _, kwargs = mock_client.chat.completions.create.call_args
+        self.assertTrue(kwargs["stream"])
 
-    @patch("gpt.generate_text")
-    def test_main_with_argument(self, mock_generate_text):
+    @patch("tools.gpt.gpt.stream_text")
+    def test_main_with_argument(self, mock_stream_text):
         # Setup mock
-        mock_generate_text.return_value = "Generated text response"
+        mock_stream_text.return_value = iter(["Generated ", "text response"])
 
         # Test with command line arguments
         with patch("sys.argv", ["gpt", "Test prompt"]):
@@ -47,11 +50,11 @@ class TestGPT(unittest.TestCase):
                 self.assertEqual(fake_out.getvalue().strip(), "Generated text response")
 
         # Check the mock was called correctly
-        mock_generate_text.assert_called_once_with(
+        mock_stream_text.assert_called_once_with(
             prompt="Test prompt", model="gpt-3.5-turbo", temperature=0.7, max_tokens=500
         )
 
-    @patch("gpt.generate_text")
+    @patch("tools.gpt.gpt.generate_text")
     def test_main_with_json_output(self, mock_generate_text):
         # Setup mock
         mock_generate_text.return_value = "Generated text response"
@@ -32,6 +32,8 @@ import time
 DEFAULT_CONFIG_DIR = os.path.expanduser("~/.config/toolkit")
 DEFAULT_CONFIG_FILE = os.path.join(DEFAULT_CONFIG_DIR, "android-backup-config.json")
 DEFAULT_BACKUP_DIR = os.environ.get("DBACKUP", "/data/backup")
+# Names of dated backup directories, from strftime("%Y-%m-%d-%H-%M-%S")
+DATED_BACKUP_RE = re.compile(r"\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}")
 
 # Setup logging
 logging.basicConfig(
@@ -91,14 +93,13 @@ def create_default_config(config_path):
 
 def load_config(config_path):
     """Load the configuration file or create default if it doesn't exist."""
-    if not os.path.exists(config_path):
-        return create_default_config(config_path)
-
     try:
         with open(config_path, "r") as f:
             config = json.load(f)
         logger.info(f"Loaded configuration from {config_path}")
         return config
+    except FileNotFoundError:
+        return create_default_config(config_path)
     except Exception as e:
         logger.error(f"Error loading configuration: {e}")
         logger.info("Using default configuration")
@@ -232,13 +233,17 @@ def pull_files(source_path, dest_path, device=None, exclusions=None):
 
         # Pull each file
         success_count = 0
+        created_dirs = set()
         for file_path in filtered_files:
             # Get the relative path from source
             rel_path = os.path.relpath(file_path, source_path)
             target_path = os.path.join(dest_path, rel_path)
 
-            # Create target directory
-            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            # Create target directory, once per directory rather than per file
+            target_dir = os.path.dirname(target_path)
+            if target_dir not in created_dirs:
+                os.makedirs(target_dir, exist_ok=True)
+                created_dirs.add(target_dir)
 
             # Pull the file
             pull_cmd = adb_cmd + ["pull", file_path, target_path]
@@ -328,22 +333,20 @@ def backup_app_data(app_id, dest_path, device=None, compression_level=9):
 def cleanup_old_backups(backup_dir, retention):
     """Remove old backups beyond the retention period."""
     # For each subdirectory in the backup dir (photos, videos, etc.)
-    for item in os.listdir(backup_dir):
-        item_path = os.path.join(backup_dir, item)
-        if not os.path.isdir(item_path):
-            continue
+    with os.scandir(backup_dir) as entries:
+        item_paths = [entry.path for entry in entries if entry.is_dir()]
 
+    for item_path in item_paths:
         logger.info(f"Cleaning up old backups in {item_path}")
 
         try:
             # Find all dated backups (looking for YYYY-MM-DD-HH-MM-SS format)
-            dated_dirs = []
-            for subdir in os.listdir(item_path):
-                subdir_path = os.path.join(item_path, subdir)
-                if os.path.isdir(subdir_path) and re.match(
-                    r"^\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}$", subdir
-                ):
-                    dated_dirs.append(subdir)
+            with os.scandir(item_path) as subdirs:
+                dated_dirs = [
+                    subdir.name
+                    for subdir in subdirs
+                    if DATED_BACKUP_RE.fullmatch(subdir.name) and subdir.is_dir()
+                ]
 
             # Sort by date (newest first)
             dated_dirs.sort(reverse=True)
@@ -1031,6 +1034,7 @@ def main():
                     os.makedirs(type_backup_dir, exist_ok=True)
 
                     # For each extension, find and pull matching files
+                    created_dirs = set()
                     for ext in file_extensions:
                         # Find command with wildcard extension
                         find_cmd = adb_cmd + [
@@ -1057,8 +1061,11 @@ def main():
                                 rel_path = os.path.relpath(file_path, source_path)
                                 target_path = os.path.join(type_backup_dir, rel_path)
 
-                                # Create target directory
-                                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                                # Create target directory, once per directory
+                                target_dir = os.path.dirname(target_path)
+                                if target_dir not in created_dirs:
+                                    os.makedirs(target_dir, exist_ok=True)
+                                    created_dirs.add(target_dir)
 
                                 # Pull the file
                                 pull_cmd = adb_cmd + ["pull", file_path, target_path]
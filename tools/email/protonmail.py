@@ -31,10 +31,29 @@ import os
 import re
 import smtplib
 import sys
+import uuid
 from email.message import EmailMessage, Message
+from email.parser import BytesParser
 from email.utils import formatdate, make_msgid, parsedate_to_datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+# Number of messages requested per IMAP FETCH command during sync.
+FETCH_BATCH_SIZE = 500
+
+# IMAP LIST response line: (\Flags) "delimiter" "Folder Name"
+LIST_RESPONSE_PATTERN = re.compile(rb'^\([^)]*\)\s+(?:"[^"]*"|NIL)\s+"?(.*?)"?\s*$')
+
+# Translation tables for filename sanitizing; str.translate avoids a regex pass per call.
+FILENAME_TRANSLATION = str.maketrans(
+    {
+        **dict.fromkeys('<>:"/\\|?*', "_"),
+        **dict.fromkeys(map(chr, [*range(0x20), 0x7F])),
+    }
+)
+EMAIL_TRANSLATION = str.maketrans(
+    {"@": "_", **dict.fromkeys("<>\"'"), **dict.fromkeys("/\\:*?|", "_")}
+)
 
 
 def load_config() -> dict[str, Any]:
@@ -96,18 +115,41 @@ def list_folders(imap: imaplib.IMAP4) -> list[str]:
 
     folder_list: list[str] = []
     for folder in folders:
-        if isinstance(folder, bytes):
-            folder_str = folder.decode()
-        else:
-            folder_str = str(folder)
-        folder_parts = folder_str.split(' "/"')
-        if len(folder_parts) > 1:
-            folder_name = folder_parts[-1].strip().strip('"')
-            folder_list.append(folder_name)
+        if not isinstance(folder, bytes):
+            continue
+        match = LIST_RESPONSE_PATTERN.match(folder)
+        if match:
+            folder_list.append(match.group(1).decode())
 
     return folder_list
 
 
+def fetch_messages(
+    imap: imaplib.IMAP4, message_ids: list[bytes]
+) -> Iterator[tuple[str, bytes]]:
+    """Fetch raw messages in batches, yielding (message number, raw email) pairs."""
+    for start in range(0, len(message_ids), FETCH_BATCH_SIZE):
+        batch = message_ids[start : start + FETCH_BATCH_SIZE]
+        try:
+            status, data = imap.fetch(b",".join(batch).decode(), "(RFC822)")
+        except imaplib.IMAP4.error as e:
+            print(
+                f"    Warning: Error fetching messages {start + 1}-{start + len(batch)}: {e}"
+            )
+            continue
+        if status != "OK" or not data:
+            continue
+
+        # Responses alternate between (envelope, literal) tuples and b")" closers.
+        for item in data:
+            if not isinstance(item, tuple) or not isinstance(item[1], bytes):
+                continue
+            envelope = item[0]
+            if isinstance(envelope, bytes):
+                envelope = envelope.decode(errors="replace")
+            yield envelope.split(" ", 1)[0], item[1]
+
+
 def list_emails_local(folder: str = "INBOX", limit: int = 20) -> bool:
     """List emails from local cache. Returns True if successful, False if cache doesn't exist."""
     try:
@@ -256,18 +298,17 @@ def search_emails_local(query: str, folder: str = "INBOX") -> bool:
 
         # Search through all .eml files
         matches: list[tuple[Path, Message]] = []
-        query_lower = query.lower()
+        query_pattern = re.compile(re.escape(query), re.IGNORECASE)
 
         for eml_file in folder_path.glob("*.eml"):
             try:
                 with open(eml_file, "rb") as f:
                     msg = email.message_from_bytes(f.read())
 
-                subject = msg.get("Subject", "").lower()
-                from_addr = msg.get("From", "").lower()
-
                 # Check if query matches subject or from
-                if query_lower in subject or query_lower in from_addr:
+                if query_pattern.search(msg.get("Subject", "")) or query_pattern.search(
+                    msg.get("From", "")
+                ):
                     matches.append((eml_file, msg))
             except Exception:
                 # Skip files we can't read
@@ -364,26 +405,20 @@ def send_email(config: dict[str, Any]) -> None:
         sys.exit(1)
 
 
-def sanitize_filename(filename: str) -> str:
+def sanitize_filename(filename: str, max_length: int | None = 200) -> str:
     """Sanitize a string to be used as a filename."""
-    # Remove or replace invalid filename characters
-    filename = re.sub(r'[<>:"/\\|?*]', "_", filename)
-    # Remove control characters
-    filename = re.sub(r"[\x00-\x1f\x7f]", "", filename)
-    # Limit length to 200 characters
-    if len(filename) > 200:
-        filename = filename[:200]
+    # Replace invalid filename characters and remove control characters
+    filename = filename.translate(FILENAME_TRANSLATION)
+    # Limit length unless the caller enforces its own budget
+    if max_length is not None and len(filename) > max_length:
+        filename = filename[:max_length]
     return filename.strip()
 
 
 def sanitize_email(email_addr: str) -> str:
     """Sanitize email address for use in filename."""
-    # Replace @ with underscore
-    email_addr = email_addr.replace("@", "_")
-    # Remove angle brackets and quotes
-    email_addr = re.sub(r'[<>"\']', "", email_addr)
-    # Replace other invalid characters with underscore
-    email_addr = re.sub(r"[/\\:*?|]", "_", email_addr)
+    # Replace @ and invalid characters with underscores, drop brackets and quotes
+    email_addr = email_addr.translate(EMAIL_TRANSLATION)
     return email_addr.strip()
 
 
@@ -406,6 +441,17 @@ def get_sync_dir() -> Path:
     return Path(f"{ddata}/messages/email/protonmail")
 
 
+def read_email_headers(path: Path) -> bytes:
+    """Read an .eml file's header block, stopping at the first blank line."""
+    header_lines = []
+    with open(path, "rb") as f:
+        for line in f:
+            if line in (b"\n", b"\r\n"):
+                break
+            header_lines.append(line)
+    return b"".join(header_lines)
+
+
 def generate_email_filename(msg: Message, max_length: int = 255) -> str:
     """Generate filename in format: YYYY-MM-DD_HH-MM-SS_from_FROM_to_TO_SUBJECT.eml."""
     # Parse date
@@ -431,19 +477,13 @@ def generate_email_filename(msg: Message, max_length: int = 255) -> str:
 
     # Sanitize subject
     subject = msg.get("Subject", "no-subject")
-    subject_safe = sanitize_filename(subject)
+    subject_safe = sanitize_filename(subject, max_length=None)
 
-    # Calculate how much space we have for the subject
     # Format: {date}_from_{from}_to_{to}_{subject}.eml
-    prefix = f"{date_str}_from_{from_safe}_to_{to_safe}_"
+    # Truncate once at the end so long addresses can't push the name past max_length.
     suffix = ".eml"
-    available_length = max_length - len(prefix) - len(suffix)
-
-    # Truncate subject if needed
-    if len(subject_safe) > available_length:
-        subject_safe = subject_safe[:available_length]
-
-    return f"{prefix}{subject_safe}{suffix}"
+    stem = f"{date_str}_from_{from_safe}_to_{to_safe}_{subject_safe}"
+    return f"{stem[: max(0, max_length - len(suffix))]}{suffix}"
 
 
 def sync_emails(config: dict[str, Any], output_dir: str | None = None) -> None:
@@ -497,29 +537,24 @@ def sync_emails(config: dict[str, Any], output_dir: str | None = None) -> None:
             skipped = 0
 
             # Build a set of existing Message-IDs for idempotency
+            # Only headers are needed here, so bodies are never read.
             existing_message_ids: set[str] = set()
+            header_parser = BytesParser()
             for existing_file in folder_path.glob("*.eml"):
                 try:
-                    with open(existing_file, "rb") as f:
-                        existing_msg = email.message_from_bytes(f.read())
-                        existing_msg_id = existing_msg.get("Message-ID", "")
-                        if existing_msg_id:
-                            existing_message_ids.add(existing_msg_id)
+                    existing_msg = header_parser.parsebytes(
+                        read_email_headers(existing_file), headersonly=True
+                    )
+                    existing_msg_id = existing_msg.get("Message-ID", "")
+                    if existing_msg_id:
+                        existing_message_ids.add(existing_msg_id)
                 except Exception:
                     # Skip files we can't read
                     pass
 
-            for msg_id in message_ids:
+            for msg_num, raw_email in fetch_messages(imap, message_ids):
                 try:
-                    # Fetch the complete email
-                    status, data = imap.fetch(msg_id, "(RFC822)")
-                    if status != "OK" or not data or not data[0]:
-                        continue
-
-                    raw_email = data[0][1]
-                    if not isinstance(raw_email, bytes):
-                        continue
-                    msg = email.message_from_bytes(raw_email)
+                    msg = header_parser.parsebytes(raw_email, headersonly=True)
 
                     # Check if we already have this email by Message-ID (true idempotency)
                     msg_message_id = msg.get("Message-ID", "")
@@ -531,9 +566,16 @@ def sync_emails(config: dict[str, Any], output_dir: str | None = None) -> None:
                     filename = generate_email_filename(msg)
                     filepath = folder_path / filename
 
-                    # Write email to file
-                    with open(filepath, "wb") as f:
-                        f.write(raw_email)
+                    # Write to a temp file first so an interrupted sync never
+                    # leaves a truncated .eml behind. The temp name is short
+                    # because filename may already be at the 255-byte limit.
+                    tmp_path = folder_path / f".{uuid.uuid4().hex}.tmp"
+                    try:
+                        tmp_path.write_bytes(raw_email)
+                        os.replace(tmp_path, filepath)
+                    except BaseException:
+                        tmp_path.unlink(missing_ok=True)
+                        raise
 
                     synced += 1
                     # Add to set so we don't process duplicates in same run
@@ -541,9 +583,7 @@ def sync_emails(config: dict[str, Any], output_dir: str | None = None) -> None:
                         existing_message_ids.add(msg_message_id)
 
                 except Exception as e:
-                    print(
-                        f"    Warning: Error processing message {msg_id.decode()}: {e}"
-                    )
+                    print(f"    Warning: Error processing message {msg_num}: {e}")
                     continue
 
             print(f"    Synced: {synced} new, {skipped} already existed")
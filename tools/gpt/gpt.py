@@ -15,10 +15,10 @@ Examples:
 
 import sys
 import os
-import json
 import argparse
 import openai
-from typing import Optional
+import orjson
+from typing import Iterator, Optional
 
 # Default settings
 DEFAULT_MODEL = "gpt-3.5-turbo"
@@ -42,18 +42,20 @@ def get_api_key() -> Optional[str]:
     for path in config_paths:
         if os.path.exists(path):
             try:
-                with open(path, "r") as f:
-                    config = json.load(f)
+                with open(path, "rb") as f:
+                    config = orjson.loads(f.read())
                     if "api_key" in config:
                         return config["api_key"]
-            except (json.JSONDecodeError, IOError):
+            except (orjson.JSONDecodeError, IOError):
                 pass
 
     return None
 
 
-def generate_text(prompt: str, model: str, temperature: float, max_tokens: int) -> str:
-    """Generate text using OpenAI's API."""
+def stream_text(
+    prompt: str, model: str, temperature: float, max_tokens: int
+) -> Iterator[str]:
+    """Stream generated text from OpenAI's API as it arrives."""
     api_key = get_api_key()
     if not api_key:
         sys.stderr.write("Error: OpenAI API key not found.\n")
@@ -73,14 +75,24 @@ def generate_text(prompt: str, model: str, temperature: float, max_tokens: int)
             ],
             temperature=temperature,
             max_tokens=max_tokens,
+            stream=True,
         )
-        content = response.choices[0].message.content
-        return content if content is not None else ""
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                yield content
     except Exception as e:
         sys.stderr.write(f"Error: {str(e)}\n")
         sys.exit(1)
 
 
+def generate_text(prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+    """Generate text using OpenAI's API."""
+    return "".join(stream_text(prompt, model, temperature, max_tokens))
+
+
 def main():
     """Main function to parse arguments and generate text."""
     parser = argparse.ArgumentParser(
@@ -130,19 +142,25 @@ def main():
             parser.print_help()
             sys.exit(1)
 
-    # Generate text
-    result = generate_text(
-        prompt=prompt,
-        model=args.model,
-        temperature=args.temperature,
-        max_tokens=args.max_tokens,
-    )
-
-    # Output results
+    # JSON output needs the complete response, so only plain output streams.
     if args.json:
-        json.dump({"prompt": prompt, "result": result}, sys.stdout)
+        result = generate_text(
+            prompt=prompt,
+            model=args.model,
+            temperature=args.temperature,
+            max_tokens=args.max_tokens,
+        )
+        sys.stdout.write(orjson.dumps({"prompt": prompt, "result": result}).decode())
     else:
-        print(result)
+        for content in stream_text(
+            prompt=prompt,
+            model=args.model,
+            temperature=args.temperature,
+            max_tokens=args.max_tokens,
+        ):
+            sys.stdout.write(content)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
 
     return 0
 
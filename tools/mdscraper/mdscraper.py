@@ -21,8 +21,39 @@ Options:
 import sys
 import os
 import argparse
+import codecs
+import contextlib
 import fnmatch
+import functools
+import io
 import re
+import shutil
+
+# Bytes read from the start of a file to decide whether it is text.
+SNIFF_SIZE = 8192
+
+# Extensions classified without opening the file; anything else is sniffed.
+TEXT_EXTENSIONS = frozenset(
+    ".md .txt .rst .py .js .ts .json .yaml .yml .toml .html .css .go .rs .c .h "
+    ".cpp .sh".split()
+)
+BINARY_EXTENSIONS = frozenset(
+    ".png .jpg .jpeg .gif .ico .pdf .zip .tar .gz .exe .dll .so .o .a .pyc "
+    ".class .jar .woff .woff2".split()
+)
+
+# Upper bound on sniffed file bytes kept in memory for reuse when writing output.
+PREREAD_BUDGET = 16 * 1024 * 1024
+
+# Chunk size used when copying file content to the output.
+COPY_BUFFER_SIZE = 64 * 1024
+
+# Files up to this size are decoded into memory and written in one go; larger
+# files are checked in a first pass and then copied in chunks.
+DECODE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Write buffer for the combined output, so many small writes become few syscalls.
+OUTPUT_BUFFER_SIZE = 1024 * 1024
 
 
 def parse_ignore_file(ignore_file_path):
@@ -41,97 +72,188 @@ def parse_ignore_file(ignore_file_path):
     return patterns
 
 
-def should_ignore(path, patterns):
-    """Determine if a file should be ignored based on patterns."""
-    # Always ignore hidden files
-    if os.path.basename(path).startswith("."):
+@functools.lru_cache(maxsize=None)
+def compile_pattern_group(group):
+    """Fuse a tuple of glob patterns into one regex, compiled once per process."""
+    if not group:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in group))
+
+
+def compile_patterns(patterns):
+    """Compile ignore patterns into (negation, file, directory) regexes.
+
+    Each group is fused into a single alternation so a path is matched with
+    one regex call per group. Groups without patterns are None.
+    """
+    negation_patterns = tuple(p[1:] for p in patterns if p.startswith("!"))
+    file_patterns = tuple(
+        p for p in patterns if not p.startswith("!") and not p.endswith("/")
+    )
+    dir_patterns = tuple(
+        p for p in patterns if not p.startswith("!") and p.endswith("/")
+    )
+    return (
+        compile_pattern_group(negation_patterns),
+        compile_pattern_group(file_patterns),
+        compile_pattern_group(dir_patterns),
+    )
+
+
+def should_ignore(path, compiled_patterns):
+    """Determine if a file should be ignored based on compiled patterns."""
+    negation_re, file_re, dir_re = compiled_patterns
+
+    # Always ignore hidden files; paths are "/"-separated, so skip os.path.basename
+    if path.startswith(".", path.rfind("/") + 1):
         return True
 
+    # A matching negation pattern overrides every ignore pattern
+    if negation_re and negation_re.match(path):
+        return False
+
     # Check for directory patterns - if path contains a directory that should be ignored
-    if "/" in path:
-        path_parts = path.split("/")
-        for i in range(len(path_parts)):
-            partial_path = "/".join(path_parts[: i + 1]) + "/"
-            for pattern in patterns:
-                if (
-                    not pattern.startswith("!")
-                    and pattern.endswith("/")
-                    and fnmatch.fnmatch(partial_path, pattern)
-                ):
-                    # Check if there's a negation pattern that overrides
-                    negation_overrides = False
-                    for neg_pattern in patterns:
-                        if neg_pattern.startswith("!") and fnmatch.fnmatch(
-                            path, neg_pattern[1:]
-                        ):
-                            negation_overrides = True
-                            break
-                    if not negation_overrides:
-                        return True
-
-    # Check if path matches any negation pattern first
-    for pattern in patterns:
-        if pattern.startswith("!"):
-            if fnmatch.fnmatch(path, pattern[1:]):
-                # If it matches a negation pattern, do not ignore
-                return False
+    if dir_re and "/" in path:
+        partial_path = ""
+        for part in path.split("/"):
+            partial_path += part + "/"
+            if dir_re.match(partial_path):
+                return True
 
     # Then check if it matches any regular pattern
-    for pattern in patterns:
-        if not pattern.startswith("!") and not pattern.endswith("/"):
-            if fnmatch.fnmatch(path, pattern):
-                return True
+    if file_re and file_re.match(path):
+        return True
 
     # Default: don't ignore
     return False
 
 
-def scan_directory(directory, patterns, recursive=False):
-    """Scan a directory for text files, filtering by ignore patterns."""
+def read_text_head(path):
+    """Read the first bytes of a file, returning them only if they look like UTF-8 text."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        chunk = os.read(fd, SNIFF_SIZE)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+    if b"\x00" in chunk:
+        return None
+    try:
+        chunk.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the read limit is still text.
+        if len(chunk) == SNIFF_SIZE and e.reason == "unexpected end of data":
+            return chunk
+        return None
+    return chunk
+
+
+def scan_directory(directory, patterns, recursive=False, preread=None):
+    """Scan a directory for text files, filtering by ignore patterns.
+
+    If a preread dict is given, files that were read completely while being
+    sniffed are stored in it (path -> bytes) so they need not be read again.
+    """
+    compiled_patterns = compile_patterns(patterns)
+    dir_re = compiled_patterns[2]
     files = []
-
-    for item in os.listdir(directory):
-        path = os.path.join(directory, item)
-        rel_path = os.path.relpath(path, directory)
-
-        if should_ignore(rel_path, patterns):
-            continue
-
-        if os.path.isfile(path):
-            # Only include text files
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    f.read(1024)  # Try to read a bit to check if it's text
+    preread_budget = PREREAD_BUDGET
+
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                name = entry.name
+                if should_ignore(name, compiled_patterns):
+                    continue
+
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not (dir_re and dir_re.match(name + "/")):
+                        pending.append(entry.path)
+                    continue
+                # Reading a FIFO or device would block or never end.
+                if not entry.is_file():
+                    continue
+
+                path = entry.path
+                # Only include text files, sniffing only when the extension is unknown
+                extension = os.path.splitext(name)[1].lower()
+                if extension in BINARY_EXTENSIONS:
+                    continue
+                if extension in TEXT_EXTENSIONS:
+                    files.append(path)
+                    continue
+
+                head = read_text_head(path)
+                if head is None:
+                    continue
                 files.append(path)
-            except UnicodeDecodeError:
-                # Skip binary files
-                continue
-        elif os.path.isdir(path) and recursive:
-            # For directories, check if the directory itself should be ignored
-            dir_path = rel_path + "/"
-            if any(
-                pattern.endswith("/") and fnmatch.fnmatch(dir_path, pattern)
-                for pattern in patterns
-                if not pattern.startswith("!")
-            ):
-                # Directory matches an ignore pattern, skip it
-                continue
-
-            # Process subdirectories recursively if requested
-            subdir_files = scan_directory(path, patterns, recursive)
-            files.extend(subdir_files)
+                # A short read means the sniff already holds the whole file
+                if preread is not None and len(head) < SNIFF_SIZE <= preread_budget:
+                    preread[path] = head
+                    preread_budget -= len(head)
 
     # Sort files for consistent output
     return sorted(files)
 
 
-def extract_file_content(file_path):
-    """Extract content from a file."""
+def write_file_content(file_path, out, content=None):
+    """Write a file's content to an output stream.
+
+    The whole file is decoded before anything is written, so a file that is
+    not valid UTF-8 produces only an error message. Files up to
+    DECODE_BUFFER_SIZE are held in memory and read once; larger ones are read
+    a second time to copy them, trading that read for bounded memory. Content
+    already read into memory (as UTF-8 bytes) is written directly, with the
+    same newline translation.
+    """
+    if content is not None:
+        text = content.decode("utf-8")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        out.write(text)
+        return
+
+    # Decode as text mode would, translating \r\n and \r to \n
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder("utf-8")(), translate=True
+    )
+    parts = []
+    size = 0
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        with open(file_path, "rb") as f:
+            while chunk := f.read(COPY_BUFFER_SIZE):
+                text = decoder.decode(chunk)
+                if parts is not None:
+                    parts.append(text)
+                    size += len(chunk)
+                    if size > DECODE_BUFFER_SIZE:
+                        # Too large to hold; keep decoding only to validate
+                        parts = None
+            text = decoder.decode(b"", final=True)
     except UnicodeDecodeError:
-        return f"ERROR: Could not decode {file_path} as UTF-8"
+        out.write(f"ERROR: Could not decode {file_path} as UTF-8")
+        return
+
+    if parts is not None:
+        parts.append(text)
+        out.write("".join(parts))
+        return
+
+    # The file decoded cleanly, so copy it in chunks without holding it
+    with open(file_path, "r", encoding="utf-8") as f:
+        shutil.copyfileobj(f, out, COPY_BUFFER_SIZE)
+
+
+def relative_path(file_path, base_dir):
+    """Return a scanned file's path relative to base_dir, with "/" separators."""
+    # Scanned paths all start with base_dir, so slicing replaces os.path.relpath
+    return file_path[len(os.path.join(base_dir, "")) :].replace(os.sep, "/")
 
 
 def create_toc(files, base_dir):
@@ -139,7 +261,7 @@ def create_toc(files, base_dir):
     toc = ["# Table of Contents\n"]
 
     for file_path in files:
-        rel_path = os.path.relpath(file_path, base_dir)
+        rel_path = relative_path(file_path, base_dir)
         file_name = os.path.basename(file_path)
         # Create a GitHub-style anchor link
         anchor = file_name.lower().replace(" ", "-")
@@ -149,6 +271,51 @@ def create_toc(files, base_dir):
     return "\n".join(toc) + "\n\n"
 
 
+def open_output(path=None):
+    """Open the output file, or stdout if no path is given, with a large buffer."""
+    if path:
+        return open(path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError):
+        # Replaced stdout (e.g. StringIO) has no descriptor to reopen
+        return contextlib.nullcontext(sys.stdout)
+    sys.stdout.flush()
+    return open(fd, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE, closefd=False)
+
+
+def write_markdown(
+    out, files, base_dir, toc=False, headers=True, include_path=False, preread=None
+):
+    """Write the combined markdown document for files to an output stream.
+
+    preread maps paths to file content already read by scan_directory.
+    """
+    preread = preread or {}
+
+    # Add table of contents if requested
+    if toc:
+        out.write(create_toc(files, base_dir))
+        out.write("\n")
+
+    # Process each file
+    for index, file_path in enumerate(files):
+        # Add separator between files
+        if index:
+            out.write("\n\n---\n\n")
+
+        # Add header unless disabled
+        if headers:
+            if include_path:
+                out.write(f"# {relative_path(file_path, base_dir)}\n\n")
+            else:
+                out.write(f"# {os.path.basename(file_path)}\n\n")
+
+        # Add file content
+        write_file_content(file_path, out, preread.get(file_path))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Combine text files into a single markdown document"
@@ -204,53 +371,30 @@ def main():
         output_basename = os.path.basename(args.output)
         ignore_patterns.append(output_basename)
 
-    # Scan for files
-    files = scan_directory(directory, ignore_patterns, args.recursive)
+    # Scan for files, keeping small sniffed files so they are only read once
+    preread = {}
+    files = scan_directory(directory, ignore_patterns, args.recursive, preread)
 
     if not files:
         print(f"Warning: No text files found in {directory}", file=sys.stderr)
         return 0
 
-    # Build the markdown content
-    content = []
-
-    # Add table of contents if requested
-    if args.toc:
-        content.append(create_toc(files, directory))
-
-    # Process each file
-    for file_path in files:
-        rel_path = os.path.relpath(file_path, directory)
-        file_name = os.path.basename(file_path)
-
-        # Add header unless disabled
-        if not args.no_headers:
-            if args.include_path:
-                content.append(f"# {rel_path}\n")
-            else:
-                content.append(f"# {file_name}\n")
-
-        # Add file content
-        file_content = extract_file_content(file_path)
-        content.append(file_content)
-
-        # Add separator between files
-        content.append("\n---\n")
-
-    # Remove the last separator if it exists
-    if content and content[-1] == "\n---\n":
-        content.pop()
-
-    # Join all content
-    markdown = "\n".join(content)
+    # Stream the markdown content rather than holding every file in memory
+    with open_output(args.output) as out:
+        write_markdown(
+            out,
+            files,
+            directory,
+            args.toc,
+            not args.no_headers,
+            args.include_path,
+            preread,
+        )
+        if not args.output:
+            out.write("\n")
 
-    # Output the result
     if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
-            f.write(markdown)
         print(f"Created '{args.output}'", file=sys.stderr)
-    else:
-        print(markdown)
 
     return 0
 
@@ -3,6 +3,7 @@
 Tests for mdscraper tool
 """
 
+import io
 import os
 import sys
 import tempfile
@@ -11,10 +12,11 @@ import unittest
 # Add parent directory to path so we can import mdscraper module
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from mdscraper import (
+    compile_patterns,
     parse_ignore_file,
     should_ignore,
     scan_directory,
-    extract_file_content,
+    write_file_content,
 )
 
 
@@ -79,7 +81,7 @@ temp/
 
     def test_should_ignore(self):
         """Test the ignore pattern matching"""
-        patterns = ["*.log", "temp/", "!important.log"]
+        patterns = compile_patterns(["*.log", "temp/", "!important.log"])
 
         # Should be ignored
         self.assertTrue(should_ignore("test.log", patterns))
@@ -119,12 +121,60 @@ temp/
         self.assertNotIn("test.log", file_basenames)
         self.assertNotIn("tempfile.txt", file_basenames)  # In ignored directory
 
-    def test_extract_file_content(self):
-        """Test extracting content from files"""
+    def test_scan_directory_skips_special_files(self):
+        """Test that FIFOs and other non-regular files are not scraped"""
+        os.mkfifo(os.path.join(self.dir_path, "pipe.md"))
+
+        files = scan_directory(self.dir_path, [], recursive=False)
+
+        file_basenames = [os.path.basename(f) for f in files]
+        self.assertIn("file1.txt", file_basenames)
+        self.assertNotIn("pipe.md", file_basenames)
+
+    def test_scan_directory_skips_dangling_symlinks(self):
+        """Test that a symlink to a missing file is skipped despite its extension"""
+        os.symlink("nowhere.md", os.path.join(self.dir_path, "broken.md"))
+
+        files = scan_directory(self.dir_path, [], recursive=False)
+
+        file_basenames = [os.path.basename(f) for f in files]
+        self.assertIn("file1.txt", file_basenames)
+        self.assertNotIn("broken.md", file_basenames)
+
+    def test_write_file_content(self):
+        """Test writing content from files"""
         file_path = os.path.join(self.dir_path, "file1.txt")
-        content = extract_file_content(file_path)
+        out = io.StringIO()
+        write_file_content(file_path, out)
+
+        self.assertEqual(out.getvalue(), "This is file 1\nIt has some content.")
+
+    def test_write_file_content_translates_newlines(self):
+        """Test that pre-read and streamed content get the same newlines"""
+        file_path = os.path.join(self.dir_path, "crlf.cfg")
+        with open(file_path, "wb") as f:
+            f.write(b"a=1\r\nb=2\rc=3\n")
+
+        streamed = io.StringIO()
+        write_file_content(file_path, streamed)
+        preread = io.StringIO()
+        write_file_content(file_path, preread, b"a=1\r\nb=2\rc=3\n")
+
+        self.assertEqual(streamed.getvalue(), "a=1\nb=2\nc=3\n")
+        self.assertEqual(preread.getvalue(), streamed.getvalue())
+
+    def test_write_file_content_invalid_utf8(self):
+        """Test that a file invalid past the first chunk writes only the error"""
+        file_path = os.path.join(self.dir_path, "late.txt")
+        with open(file_path, "wb") as f:
+            f.write(b"a" * 70000 + b"\xff")
+
+        out = io.StringIO()
+        write_file_content(file_path, out)
 
-        self.assertEqual(content, "This is file 1\nIt has some content.")
+        self.assertEqual(
+            out.getvalue(), f"ERROR: Could not decode {file_path} as UTF-8"
+        )
 
 
 if __name__ == "__main__":
@@ -5,27 +5,32 @@ docx-extractor: Extract content and metadata from Word .docx files
 Reads a Word .docx file and outputs a JSON object containing the file's content
 and metadata including filename, size, title, author, creation date, etc.
 
-Usage: docx-extractor [options] [FILE]
+Usage: docx-extractor [options] [FILE...]
 
 Examples:
   docx-extractor document.docx           # Extract from a Word file
+  docx-extractor a.docx b.docx           # One JSON object per line, per file
 """
 
 import sys
 import os
-import json
 import argparse
+import orjson
 import subprocess
 from datetime import datetime
 import mimetypes
-from pathlib import Path
-import re
+
+try:
+    from tools.search.extractor_batch import write_jsonl
+except ImportError:  # Run as a script from tools/search
+    from extractor_batch import write_jsonl  # type: ignore
 
 
 def get_file_metadata(file_path):
     """Get file metadata including creation time, modification time, size, etc."""
-    path = Path(file_path)
-    stat = path.stat()
+    stat = os.stat(file_path)
+    name = os.path.basename(file_path)
+    extension = os.path.splitext(name)[1].lstrip(".")
 
     # Get file modification and creation times
     mtime = datetime.fromtimestamp(stat.st_mtime).isoformat()
@@ -40,16 +45,40 @@ def get_file_metadata(file_path):
         mime_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"  # Default for .docx
 
     return {
-        "filename": path.name,
-        "path": str(path.absolute()),
+        "filename": name,
+        "path": os.path.abspath(file_path),
         "size": stat.st_size,
         "created_at": ctime,
         "modified_at": mtime,
         "mime_type": mime_type,
-        "extension": path.suffix.lstrip(".") if path.suffix else "docx",
+        "extension": extension or "docx",
     }
 
 
+def inlines_to_text(inlines):
+    """Flatten a list of pandoc JSON inline elements to plain text."""
+    parts = []
+    for node in inlines:
+        # Containers such as Link and Span nest their inlines in inner lists
+        if isinstance(node, list):
+            parts.append(inlines_to_text(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        kind = node.get("t")
+        content = node.get("c")
+        if kind == "Str":
+            parts.append(content)
+        elif kind in ("Space", "SoftBreak", "LineBreak"):
+            parts.append(" ")
+        elif kind in ("Code", "Math", "RawInline") and isinstance(content, list):
+            parts.append(content[-1])
+        elif kind != "Note" and isinstance(content, list):
+            parts.append(inlines_to_text(content))
+    return "".join(parts)
+
+
 def extract_docx_metadata(file_path):
     """Extract metadata from a DOCX file using pandoc."""
     metadata = {}
@@ -61,12 +90,11 @@ def extract_docx_metadata(file_path):
             ["pandoc", "--standalone", "--to=json", file_path],
             check=True,
             capture_output=True,
-            text=True,
         )
 
         try:
-            # Parse the JSON output
-            data = json.loads(result.stdout)
+            # Parse the JSON output straight from bytes, skipping a text decode
+            data = orjson.loads(result.stdout)
 
             # Extract metadata fields from the JSON structure
             if "meta" in data:
@@ -112,23 +140,18 @@ def extract_docx_metadata(file_path):
                     keywords_data = meta["keywords"]
                     if isinstance(keywords_data, dict) and "c" in keywords_data:
                         metadata["keywords"] = keywords_data["c"]
-        except json.JSONDecodeError:
-            pass
 
-        # Method 2: Extract title from first header if not found in metadata
-        if "title" not in metadata:
-            # Convert to markdown and look for the first header
-            result = subprocess.run(
-                ["pandoc", "-f", "docx", "-t", "markdown", file_path],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-
-            content = result.stdout.strip()
-            title_match = re.search(r"^# (.+)$", content, re.MULTILINE)
-            if title_match:
-                metadata["title"] = title_match.group(1).strip()
+            # Method 2: Use the first level-1 header if no title is in the metadata.
+            # The document AST is already parsed, so no second pandoc run is needed.
+            if "title" not in metadata:
+                for block in data.get("blocks", []):
+                    if block.get("t") == "Header" and block["c"][0] == 1:
+                        title = inlines_to_text(block["c"][2]).strip()
+                        if title:
+                            metadata["title"] = title
+                        break
+        except orjson.JSONDecodeError:
+            pass
 
         return metadata
     except subprocess.CalledProcessError:
@@ -165,14 +188,13 @@ def extract_docx_content(file_path):
 
 def process_file(file_path):
     """Extract content and metadata from the file."""
-    # Check if input file exists
-    if not file_path or not os.path.exists(file_path):
+    # Get file metadata; its stat also tells us whether the file exists
+    try:
+        metadata = get_file_metadata(file_path)
+    except FileNotFoundError:
         sys.stderr.write(f"Error: File '{file_path}' not found.\n")
         return {}
 
-    # Get file metadata
-    metadata = get_file_metadata(file_path)
-
     # Extract document metadata
     docx_metadata = extract_docx_metadata(file_path)
 
@@ -210,18 +232,27 @@ def main():
         if __doc__
         else "",  # Use the docstring as extended help
     )
-    parser.add_argument("file", help="Input .docx file")
+    parser.add_argument("files", nargs="+", metavar="FILE", help="Input .docx file(s)")
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Write one compact JSON object per line, one per file (implied by several files)",
+    )
     parser.add_argument(
         "-v", "--version", action="version", version="docx-extractor 1.0.0"
     )
     args = parser.parse_args()
 
+    if args.jsonl or len(args.files) > 1:
+        return write_jsonl(args.files, process_file)
+
     try:
         # Process the file
-        result = process_file(args.file)
+        result = process_file(args.files[0])
 
         # Output the result as JSON
-        print(json.dumps(result, indent=2))
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b"\n")
 
         return 0
     except Exception as e:
@@ -0,0 +1,30 @@
+"""
+Batch output shared by the search extractors.
+
+With --jsonl (or several input files) an extractor writes one compact JSON
+object per line, in input order, so callers such as the search indexer can
+extract many files with a single process.
+"""
+
+import sys
+
+import orjson
+
+
+def write_jsonl(file_paths, process_file):
+    """Write process_file's result for each file as one JSON line.
+
+    A file that fails is written as {} so line numbers still match the input.
+    Returns the exit status: 1 if any file failed, otherwise 0.
+    """
+    failed = False
+    for file_path in file_paths:
+        try:
+            result = process_file(file_path)
+        except Exception as e:
+            sys.stderr.write(f"Error: {file_path}: {e}\n")
+            result = {}
+        failed = failed or not result
+        sys.stdout.buffer.write(orjson.dumps(result))
+        sys.stdout.buffer.write(b"\n")
+    return 1 if failed else 0
@@ -5,28 +5,40 @@ pdf-extractor: Extract content and metadata from PDF files
 Reads a PDF file and outputs a JSON object containing the file's content
 and metadata including filename, size, page count, title, author, etc.
 
-Usage: pdf-extractor [options] [FILE]
+Usage: pdf-extractor [options] [FILE...]
 
 Examples:
   pdf-extractor document.pdf           # Extract from a PDF file
   cat document.pdf | pdf-extractor     # Read from stdin (if applicable)
+  pdf-extractor a.pdf b.pdf            # One JSON object per line, per file
 """
 
 import sys
 import os
-import json
+import orjson
 import argparse
 import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import mimetypes
-from pathlib import Path
-import tempfile
+
+try:
+    from tools.search.extractor_batch import write_jsonl
+except ImportError:  # Run as a script from tools/search
+    from extractor_batch import write_jsonl  # type: ignore
+
+# Plain text extraction without ligature preservation, so "ﬁ" is indexed as "fi".
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES
+
+# Documents with at least this many pages are split across worker processes.
+PARALLEL_PAGE_THRESHOLD = 64
 
 
 def get_file_metadata(file_path):
     """Get file metadata including creation time, modification time, size, etc."""
-    path = Path(file_path)
-    stat = path.stat()
+    stat = os.stat(file_path)
+    name = os.path.basename(file_path)
+    extension = os.path.splitext(name)[1].lstrip(".")
 
     # Get file modification and creation times
     mtime = datetime.fromtimestamp(stat.st_mtime).isoformat()
@@ -41,20 +53,58 @@ def get_file_metadata(file_path):
         mime_type = "application/pdf"  # Default to PDF
 
     return {
-        "filename": path.name,
-        "path": str(path.absolute()),
+        "filename": name,
+        "path": os.path.abspath(file_path),
         "size": stat.st_size,
         "created_at": ctime,
         "modified_at": mtime,
         "mime_type": mime_type,
-        "extension": path.suffix.lstrip(".") if path.suffix else "pdf",
+        "extension": extension or "pdf",
     }
 
 
-def extract_pdf_content(file_path):
-    """Extract content and metadata from a PDF file."""
+def extract_page_text(doc, start, stop):
+    """Extract text from a range of pages, with spacing after each page."""
+    return "".join(
+        f"{doc[page_num].get_text('text', flags=TEXT_FLAGS, sort=False)}\n\n"
+        for page_num in range(start, stop)
+    )
+
+
+def extract_page_range(page_range):
+    """Extract text from a (file_path, start, stop) page range in a worker process."""
+    file_path, start, stop = page_range
+    # PyMuPDF documents can't be shared between processes, so each worker opens its own
+    with fitz.open(file_path) as doc:
+        return extract_page_text(doc, start, stop)
+
+
+def extract_all_pages(doc, file_path=None):
+    """Extract text from every page, in parallel for large documents on disk."""
+    page_count = doc.page_count
+    workers = min(os.cpu_count() or 1, page_count // (PARALLEL_PAGE_THRESHOLD // 2))
+    if file_path is None or page_count < PARALLEL_PAGE_THRESHOLD or workers < 2:
+        return extract_page_text(doc, 0, page_count)
+
+    # Give each worker one contiguous range to amortize opening the document
+    step = -(-page_count // workers)
+    page_ranges = [
+        (file_path, start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    with ProcessPoolExecutor(max_workers=len(page_ranges)) as executor:
+        return "".join(executor.map(extract_page_range, page_ranges))
+
+
+def extract_pdf_content(source):
+    """Extract content and metadata from a PDF file path or in-memory PDF bytes."""
     try:
-        doc = fitz.open(file_path)
+        if isinstance(source, bytes):
+            doc = fitz.open(stream=source, filetype="pdf")
+            file_path = None
+        else:
+            doc = fitz.open(source)
+            file_path = source
 
         # Extract PDF metadata
         metadata = doc.metadata if doc.metadata else {}
@@ -70,12 +120,8 @@ def extract_pdf_content(file_path):
             "modification_date": metadata.get("modDate", ""),
         }
 
-        # Extract text content from all pages
-        content = ""
-        for page_num in range(doc.page_count):
-            page = doc[page_num]
-            content += page.get_text()  # type: ignore
-            content += "\n\n"  # Add spacing between pages
+        # Extract text content from all pages, with spacing between pages
+        content = extract_all_pages(doc, file_path)
 
         doc.close()
         return content, pdf_metadata
@@ -86,55 +132,44 @@ def extract_pdf_content(file_path):
 
 def process_file(file_path):
     """Extract content and metadata from the file."""
-    # Check if we're dealing with stdin or a file
-    temp_file = None
-
-    try:
-        if not file_path or file_path == "-":
-            # Reading from stdin, save to temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            temp_file.write(sys.stdin.buffer.read())
-            temp_file.close()
-            file_path = temp_file.name
-
-            # Create basic metadata for stdin input
-            metadata = {
-                "filename": "stdin",
-                "path": "stdin",
-                "size": os.path.getsize(file_path),
-                "created_at": datetime.now().isoformat(),
-                "modified_at": datetime.now().isoformat(),
-                "mime_type": "application/pdf",
-                "extension": "pdf",
-            }
-        else:
-            # Reading from a file
-            if not os.path.exists(file_path):
-                sys.stderr.write(f"Error: File '{file_path}' not found.\n")
-                return {}
-
-            # Get file metadata
-            metadata = get_file_metadata(file_path)
-
-        # Extract PDF content and PDF-specific metadata
-        content, pdf_metadata = extract_pdf_content(file_path)
-
-        # Create result object
-        result = {
-            **metadata,
-            **pdf_metadata,
-            "content": content,
-            "title": pdf_metadata.get("title") or metadata["filename"],
-            "tags": [tag.strip() for tag in pdf_metadata.get("keywords", "").split(",")]
-            if pdf_metadata.get("keywords")
-            else [],
+    if not file_path or file_path == "-":
+        # Reading from stdin; PyMuPDF opens the bytes directly from memory
+        source = sys.stdin.buffer.read()
+
+        # Create basic metadata for stdin input
+        metadata = {
+            "filename": "stdin",
+            "path": "stdin",
+            "size": len(source),
+            "created_at": datetime.now().isoformat(),
+            "modified_at": datetime.now().isoformat(),
+            "mime_type": "application/pdf",
+            "extension": "pdf",
         }
+    else:
+        # Reading from a file; its metadata stat also tells us it exists
+        source = file_path
+        try:
+            metadata = get_file_metadata(file_path)
+        except FileNotFoundError:
+            sys.stderr.write(f"Error: File '{file_path}' not found.\n")
+            return {}
+
+    # Extract PDF content and PDF-specific metadata
+    content, pdf_metadata = extract_pdf_content(source)
+
+    # Create result object
+    result = {
+        **metadata,
+        **pdf_metadata,
+        "content": content,
+        "title": pdf_metadata.get("title") or metadata["filename"],
+        "tags": [tag.strip() for tag in pdf_metadata.get("keywords", "").split(",")]
+        if pdf_metadata.get("keywords")
+        else [],
+    }
 
-        return result
-    finally:
-        # Clean up the temporary file if one was created
-        if temp_file and os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
+    return result
 
 
 def main():
@@ -145,18 +180,31 @@ def main():
         if __doc__
         else "",  # Use the docstring as extended help
     )
-    parser.add_argument("file", nargs="?", help="Input file (default: stdin)")
+    parser.add_argument(
+        "files", nargs="*", metavar="FILE", help="Input file(s) (default: stdin)"
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Write one compact JSON object per line, one per file (implied by several files)",
+    )
     parser.add_argument(
         "-v", "--version", action="version", version="pdf-extractor 1.0.0"
     )
     args = parser.parse_args()
 
+    if args.jsonl and not args.files:
+        parser.error("--jsonl needs at least one FILE")
+    if args.jsonl or len(args.files) > 1:
+        return write_jsonl(args.files, process_file)
+
     try:
         # Process the file
-        result = process_file(args.file)
+        result = process_file(args.files[0] if args.files else None)
 
         # Output the result as JSON
-        print(json.dumps(result, indent=2))
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b"\n")
 
         return 0
     except Exception as e:
@@ -21,6 +21,7 @@ Examples:
   search index ~/documents                    # Index a single collection
   search index ~/documents ~/papers           # Index multiple collections
   search index --verbose ~/documents          # Show detailed indexing progress
+  search index --jobs 4 ~/documents           # Run up to 4 extractors at once
 
   search query "neural networks"              # Search across all nearby collections
   search query "DNA" --in ~/papers            # Search in a specific collection
@@ -36,14 +37,23 @@ For more detailed help on a specific subcommand:
 
 import argparse
 import fnmatch
+import functools
+import hashlib
+import heapq
 import json
 import os
 import re
+import shlex
+import shutil
 import subprocess
 import sys
+import tomllib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import toml
 
 # Try to import Tantivy, but don't fail immediately if not available
@@ -72,6 +82,19 @@ SEARCH_DIR = ".search"
 CONFIG_FILE = f"{SEARCH_DIR}/config.toml"
 CACHE_DIR = f"{SEARCH_DIR}/cache"
 INDEX_DIR = f"{SEARCH_DIR}/index"
+# Kept inside the index directory so a rebuilt index starts without state
+INDEX_STATE_FILE = f"{INDEX_DIR}/index_state.json"
+
+# Tantivy commits are expensive (segment flush and fsync), so documents are
+# batched through one writer per collection and committed periodically
+WRITER_HEAP_SIZE = 128_000_000
+COMMIT_INTERVAL = 1000
+
+# Upper bound on collections searched at the same time
+MAX_SEARCH_WORKERS = 8
+
+# Directories that never contain collections, skipped when scanning for them
+SCAN_SKIP_DIRS = frozenset({".git"})
 
 # Default extractor commands for common file types
 DEFAULT_EXTRACTORS = {
@@ -81,6 +104,11 @@ DEFAULT_EXTRACTORS = {
     "*.docx": "docx-extractor {input}",
 }
 
+# Extractors shipped with this toolkit accept several files and --jsonl, so
+# the indexer can hand them files in batches of up to EXTRACTOR_BATCH_SIZE
+BATCH_EXTRACTORS = frozenset({"text-extractor", "pdf-extractor", "docx-extractor"})
+EXTRACTOR_BATCH_SIZE = 32
+
 # Default configuration
 DEFAULT_CONFIG = {
     "name": "Default Collection",
@@ -96,33 +124,54 @@ def ensure_dir(path: str) -> None:
     Path(path).mkdir(parents=True, exist_ok=True)
 
 
+def get_config_path(directory: str) -> str:
+    """Get the path of a collection's config file."""
+    # Plain concatenation: this runs for every directory cmd_query walks up
+    # through, and os.path.join's generality isn't needed here
+    return f"{directory.rstrip(os.sep)}{os.sep}{CONFIG_FILE}"
+
+
 def find_collections(start_dir: str) -> List[str]:
     """Find all search collections starting from a directory."""
     collections = []
-    start_path = Path(start_dir).resolve()
 
-    for path in start_path.glob(f"**/{SEARCH_DIR}"):
-        config_file = path / "config.toml"
-        if config_file.exists():
-            collections.append(str(path.parent))
+    # Walk breadth-first with os.scandir, never descending into .search
+    # directories (or .git) and never following symlinked directories
+    queue = deque([str(Path(start_dir).resolve())])
+    while queue:
+        directory = queue.popleft()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name == SEARCH_DIR:
+                        if os.path.isfile(get_config_path(directory)):
+                            collections.append(directory)
+                    elif entry.name not in SCAN_SKIP_DIRS and entry.is_dir(
+                        follow_symlinks=False
+                    ):
+                        queue.append(entry.path)
+        except OSError:
+            # Unreadable directories can't hold collections we could use
+            continue
 
     return collections
 
 
 def load_config(collection_dir: str) -> Dict[str, Any]:
     """Load collection configuration."""
-    config_path = os.path.join(collection_dir, CONFIG_FILE)
+    config_path = get_config_path(collection_dir)
     try:
-        with open(config_path, "r") as f:
-            return toml.load(f)
-    except (FileNotFoundError, toml.TomlDecodeError) as e:
+        # tomllib is the stdlib's parser; toml is only needed for writing
+        with open(config_path, "rb") as f:
+            return tomllib.load(f)
+    except (FileNotFoundError, tomllib.TOMLDecodeError) as e:
         sys.stderr.write(f"Error loading config: {e}\n")
         return {}
 
 
 def save_config(collection_dir: str, config: Dict[str, Any]) -> bool:
     """Save collection configuration."""
-    config_path = os.path.join(collection_dir, CONFIG_FILE)
+    config_path = get_config_path(collection_dir)
     try:
         # Ensure the .search directory exists
         ensure_dir(os.path.join(collection_dir, SEARCH_DIR))
@@ -153,64 +202,89 @@ def save_config(collection_dir: str, config: Dict[str, Any]) -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=None)
+def compile_globs(patterns: Tuple[str, ...]) -> Optional["re.Pattern[str]"]:
+    """Fuse glob patterns into one compiled regex, or None if there are none."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
 def filter_files(collection_dir: str, config: Dict[str, Any]) -> List[str]:
     """Filter files based on include/exclude patterns."""
     include_patterns = config.get("include", {}).get("patterns", ["*"])
     exclude_patterns = config.get("exclude", {}).get("patterns", [])
 
+    # Compile each pattern list once so every name is checked in a single pass
+    include_re = compile_globs(tuple(include_patterns))
+    exclude_re = compile_globs(tuple(exclude_patterns))
+
     matched_files = []
 
     # Walk the directory tree
-    for root, dirs, files in os.walk(collection_dir):
-        # Skip the .search directory
-        if os.path.basename(root) == SEARCH_DIR:
-            continue
-
-        # Check if any exclude pattern matches directories
-        skip_dir = False
-        for pattern in exclude_patterns:
-            if any(fnmatch.fnmatch(d, pattern) for d in dirs):
-                skip_dir = True
-                break
-        if skip_dir:
+    stack = [collection_dir]
+    while stack:
+        directory = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+
+                    if entry.is_dir(follow_symlinks=False):
+                        # Skip the .search directory and excluded directories
+                        # entirely. A trailing "/" lets patterns such as
+                        # ".git/*" exclude the directory itself.
+                        if name == SEARCH_DIR or (
+                            exclude_re
+                            and (exclude_re.match(name) or exclude_re.match(name + "/"))
+                        ):
+                            continue
+                        subdirs.append(entry.path)
+                        continue
+
+                    # Symlinked directories are neither followed nor matched
+                    if entry.is_symlink() and entry.is_dir():
+                        continue
+
+                    # Check include patterns
+                    if not include_re or not include_re.match(name):
+                        continue
+
+                    # Check exclude patterns
+                    if exclude_re and exclude_re.match(name):
+                        continue
+
+                    matched_files.append(entry.path)
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does
             continue
 
-        # Match files against include/exclude patterns
-        for filename in files:
-            file_path = os.path.join(root, filename)
-
-            # Skip if the file is in the .search directory
-            if SEARCH_DIR in file_path.split(os.sep):
-                continue
+        # Visit subdirectories in listing order
+        stack.extend(reversed(subdirs))
 
-            # Check include patterns
-            if not any(
-                fnmatch.fnmatch(filename, pattern) for pattern in include_patterns
-            ):
-                continue
-
-            # Check exclude patterns
-            if any(fnmatch.fnmatch(filename, pattern) for pattern in exclude_patterns):
-                continue
+    return matched_files
 
-            matched_files.append(file_path)
 
-    return matched_files
+@functools.lru_cache(maxsize=None)
+def compile_extractors(
+    custom_extractors: Tuple[Tuple[str, str], ...],
+) -> Tuple[Tuple["re.Pattern[str]", str], ...]:
+    """Compile extractor patterns in lookup order: custom first, then defaults."""
+    return tuple(
+        (re.compile(fnmatch.translate(pattern)), command)
+        for pattern, command in (*custom_extractors, *DEFAULT_EXTRACTORS.items())
+    )
 
 
 def get_extractor(filename: str, config: Dict[str, Any]) -> Optional[str]:
     """Find the appropriate extractor command for a file."""
-    # First check custom extractors defined in config
+    # Custom extractors defined in config are tried first (allowing overrides),
+    # then the default extractors. Patterns are compiled once per config.
     custom_extractors = config.get("extractors", {})
 
-    # Try to match custom extractors first (allowing overrides)
-    for pattern, command in custom_extractors.items():
-        if fnmatch.fnmatch(filename, pattern):
-            return command
-
-    # If no custom extractor matched, use the default extractors
-    for pattern, command in DEFAULT_EXTRACTORS.items():
-        if fnmatch.fnmatch(filename, pattern):
+    for pattern_re, command in compile_extractors(tuple(custom_extractors.items())):
+        if pattern_re.match(filename):
             return command
 
     return None
@@ -218,78 +292,176 @@ def get_extractor(filename: str, config: Dict[str, Any]) -> Optional[str]:
 
 def extract_metadata(file_path: str, extractor_cmd: str) -> Dict[str, Any]:
     """Execute extractor and parse output as JSON."""
-    # Replace {input} with the properly quoted file path
-    # First, escape any single quotes in the path
-    escaped_path = file_path.replace("'", "'\\''")
-    # Then wrap in single quotes to handle spaces and special characters
-    quoted_path = f"'{escaped_path}'"
-    cmd = extractor_cmd.replace("{input}", quoted_path)
-
     try:
-        # Run the extractor command
+        # Split the command ourselves and substitute {input} per argument, so
+        # the path is passed verbatim without quoting and no shell is spawned
+        argv = [arg.replace("{input}", file_path) for arg in shlex.split(extractor_cmd)]
+        if not argv:
+            raise ValueError(f"empty extractor command {extractor_cmd!r}")
+
+        # Run the extractor command, keeping its output as raw bytes
         result = subprocess.run(
-            cmd, shell=True, capture_output=True, text=True, check=True
+            argv, capture_output=True, check=True, stdin=subprocess.DEVNULL
         )
-        output = result.stdout
-
-        # Attempt to parse as JSON
-        try:
-            return json.loads(output)
-        except json.JSONDecodeError:
-            # If parsing fails, create basic metadata with content
-            return {"title": os.path.basename(file_path), "content": output}
-    except subprocess.CalledProcessError as e:
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
         sys.stderr.write(f"Error executing extractor for {file_path}: {e}\n")
         return {}
 
+    output = result.stdout
+
+    # Attempt to parse as JSON; json.loads accepts the bytes directly
+    try:
+        return json.loads(output)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        # If parsing fails, create basic metadata with content
+        return {
+            "title": os.path.basename(file_path),
+            "content": output.decode("utf-8", errors="replace"),
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def is_batch_extractor(extractor_cmd: str) -> bool:
+    """Check whether an extractor command can take several files in one run."""
+    try:
+        argv = shlex.split(extractor_cmd)
+    except ValueError:
+        return False
+    return (
+        bool(argv)
+        and os.path.basename(argv[0]) in BATCH_EXTRACTORS
+        and argv.count("{input}") == 1
+    )
+
+
+def extract_metadata_batch(
+    file_paths: List[str], extractor_cmd: str
+) -> List[Dict[str, Any]]:
+    """Extract metadata for several files, in order.
+
+    Batch-capable extractors are run once with --jsonl for all the files. If
+    that run doesn't produce one JSON line per file, each file is retried on
+    its own so a single bad document can't fail the whole batch.
+    """
+    if len(file_paths) > 1 and is_batch_extractor(extractor_cmd):
+        argv = shlex.split(extractor_cmd)
+        position = argv.index("{input}")
+        argv[position : position + 1] = ["--jsonl", *file_paths]
+        try:
+            result = subprocess.run(argv, capture_output=True, stdin=subprocess.DEVNULL)
+            lines = result.stdout.splitlines()
+            if len(lines) == len(file_paths):
+                if result.stderr:
+                    sys.stderr.write(result.stderr.decode("utf-8", errors="replace"))
+                return [json.loads(line) for line in lines]
+        except (OSError, ValueError):
+            pass
+
+    return [extract_metadata(file_path, extractor_cmd) for file_path in file_paths]
+
+
+def get_cache_path(collection_dir: str, rel_path: str) -> str:
+    """Get the cache file path for a file in a collection.
+
+    Cache files are named by a hash of the relative path, so every file gets
+    its own entry directly in CACHE_DIR whatever characters its path holds.
+    """
+    cache_key = hashlib.sha1(rel_path.encode("utf-8", "surrogateescape")).hexdigest()
+    return os.path.join(collection_dir, CACHE_DIR, f"{cache_key}.json")
+
+
+def load_cache(
+    collection_dir: str,
+    rel_path: str,
+    signature: Optional[List[Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Load cached metadata for a file, or None if there is none.
+
+    The entry must have been saved for rel_path and, when signature is given,
+    for a file with exactly that [mtime_ns, size, extractor].
+    """
+    cache_path = get_cache_path(collection_dir, rel_path)
+    try:
+        with open(cache_path, "rb") as f:
+            entry = orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError) as e:
+        sys.stderr.write(f"Warning: Ignoring unreadable cache file {cache_path}: {e}\n")
+        return None
+
+    if not isinstance(entry, dict) or entry.get("path") != rel_path:
+        return None
+    if signature is not None and entry.get("signature") != signature:
+        return None
+    metadata = entry.get("metadata")
+    return metadata if isinstance(metadata, dict) else None
+
 
 def save_cache(
     collection_dir: str,
-    file_path: str,
+    rel_path: str,
+    signature: List[Any],
     metadata: Dict[str, Any],
-    config: Dict[str, Any],
 ) -> bool:
-    """Save metadata to cache."""
+    """Save metadata to cache, along with the path and signature it is for."""
     # Ensure the cache directory exists
-    cache_dir = os.path.join(collection_dir, CACHE_DIR)
-    ensure_dir(cache_dir)
+    ensure_dir(os.path.join(collection_dir, CACHE_DIR))
 
-    # Create a cache file name based on the original file path
-    rel_path = os.path.relpath(file_path, collection_dir)
-    cache_filename = re.sub(r"[/\\]", "_", rel_path)
-
-    # Save as JSON
-    cache_path = os.path.join(cache_dir, f"{cache_filename}.json")
+    # Save as JSON; orjson encodes large extracted text far faster than json
+    cache_path = get_cache_path(collection_dir, rel_path)
+    entry = {"path": rel_path, "signature": signature, "metadata": metadata}
     try:
-        with open(cache_path, "w") as f:
-            json.dump(metadata, f, indent=2)
+        with open(cache_path, "wb") as f:
+            f.write(orjson.dumps(entry, option=orjson.OPT_INDENT_2))
         return True
     except Exception as e:
         sys.stderr.write(f"Error saving cache file {cache_path}: {e}\n")
         return False
 
 
+# Field layout of the index. It is saved next to the index as
+# schema_info.json so an index built with a different layout is detected and
+# rebuilt. "path" uses the raw tokenizer so a document can be deleted by its
+# exact relative path when the file changes.
+SCHEMA_INFO_FILE = "schema_info.json"
+SCHEMA_FIELDS = [
+    {"name": "path", "type": "text", "stored": True, "tokenizer": "raw"},
+    {"name": "title", "type": "text", "stored": True},
+    # Indexed for search only; the text is kept in the cache, not the doc store
+    {"name": "content", "type": "text", "stored": False},
+    {"name": "absolute_path", "type": "text", "stored": True},
+    # Multivalued: one value per tag
+    {"name": "tags", "type": "text", "stored": True},
+    # Lower-cased whole tags as exact terms, so --tag matches a tag as a unit
+    {"name": "tag_terms", "type": "text", "stored": False, "tokenizer": "raw"},
+]
+
+
 def create_schema():
     """Create Tantivy schema for document indexing."""
     schema_builder = tantivy.SchemaBuilder()  # type: ignore
 
     # Define fields for the schema
-    schema_builder.add_text_field("path", stored=True)
-    schema_builder.add_text_field("title", stored=True)
-    schema_builder.add_text_field("content", stored=True)
-    schema_builder.add_text_field("absolute_path", stored=True)
-    # Using text fields for tags instead of facets
-    schema_builder.add_text_field("tag_pdf", stored=True)
-    schema_builder.add_text_field("tag_test", stored=True)
-    schema_builder.add_text_field("tag_sample", stored=True)
-    # Add more common tags as needed
-    schema_builder.add_text_field(
-        "metadata", stored=True
-    )  # For storing additional JSON metadata
+    for field in SCHEMA_FIELDS:
+        schema_builder.add_text_field(
+            field["name"],
+            stored=field["stored"],
+            tokenizer_name=field.get("tokenizer", "default"),
+        )
 
     return schema_builder.build()
 
 
+def index_schema_matches(index_dir: str) -> bool:
+    """Check whether an index was built with the current SCHEMA_FIELDS."""
+    try:
+        with open(os.path.join(index_dir, SCHEMA_INFO_FILE), "r") as f:
+            return json.load(f) == {"fields": SCHEMA_FIELDS}
+    except (OSError, json.JSONDecodeError):
+        return False
+
+
 def get_or_create_index(collection_dir: str) -> tuple:
     """Get or create a Tantivy index for a collection."""
     # Check if Tantivy is available
@@ -298,106 +470,228 @@ def get_or_create_index(collection_dir: str) -> tuple:
     index_dir = os.path.join(collection_dir, INDEX_DIR)
     ensure_dir(index_dir)
 
-    # For reference only - we don't actually read this
-    schema_path = os.path.join(index_dir, "schema_info.json")
-
     # Check if index exists
     if os.path.exists(os.path.join(index_dir, "meta.json")):
-        # Try to open existing index
-        try:
-            index = tantivy.Index.open(index_dir)  # type: ignore
-            return index, None  # We don't need the schema for opened indexes
-        except Exception as e:
-            # If opening failed, create a new one
+        if index_schema_matches(index_dir):
+            # Try to open existing index
+            try:
+                index = tantivy.Index.open(index_dir)  # type: ignore
+                return index, None  # We don't need the schema for opened indexes
+            except Exception as e:
+                # If opening failed, create a new one
+                sys.stderr.write(
+                    f"Warning: Could not open existing index, creating new one: {e}\n"
+                )
+        else:
             sys.stderr.write(
-                f"Warning: Could not open existing index, creating new one: {e}\n"
+                "Warning: Index was built with a different schema, rebuilding it.\n"
             )
 
+        # Start from an empty directory; this also drops the index state
+        shutil.rmtree(index_dir)
+        ensure_dir(index_dir)
+
     # Create new schema and index
     schema = create_schema()
-    # Create basic schema info for reference
-    schema_info = {
-        "fields": [
-            {"name": "path", "type": "text", "stored": True},
-            {"name": "title", "type": "text", "stored": True},
-            {"name": "content", "type": "text", "stored": True},
-            {"name": "absolute_path", "type": "text", "stored": True},
-            {"name": "tag_pdf", "type": "text", "stored": True},
-            {"name": "tag_test", "type": "text", "stored": True},
-            {"name": "tag_sample", "type": "text", "stored": True},
-            {"name": "metadata", "type": "text", "stored": True},
-        ]
-    }
-
-    # Save schema info for reference
-    with open(schema_path, "w") as f:
-        json.dump(schema_info, f, indent=2)
+
+    # Save schema info so later runs can tell whether the layout changed
+    with open(os.path.join(index_dir, SCHEMA_INFO_FILE), "w") as f:
+        json.dump({"fields": SCHEMA_FIELDS}, f, indent=2)
 
     # Create the index
     index = tantivy.Index(schema, path=index_dir)  # type: ignore
     return index, schema
 
 
-def index_file(collection_dir: str, file_path: str, metadata: Dict[str, Any]) -> bool:
-    """Index a file using Tantivy."""
+def load_index_state(collection_dir: str) -> Dict[str, List[Any]]:
+    """Load the [mtime_ns, size, extractor] of every indexed file, by relative path."""
+    state_path = os.path.join(collection_dir, INDEX_STATE_FILE)
     try:
-        # Get or create index
-        index, _schema = get_or_create_index(collection_dir)
+        with open(state_path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        sys.stderr.write(f"Warning: Ignoring unreadable index state: {e}\n")
+        return {}
+
+
+def save_index_state(collection_dir: str, state: Dict[str, List[Any]]) -> bool:
+    """Save the index state atomically so an interrupted run can't corrupt it."""
+    state_path = os.path.join(collection_dir, INDEX_STATE_FILE)
+    tmp_path = f"{state_path}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+        return True
+    except Exception as e:
+        sys.stderr.write(f"Error saving index state {state_path}: {e}\n")
+        return False
+
 
-        # Create a writer for adding documents
-        writer = index.writer()
+def delete_path_documents(writer, rel_path: str) -> None:
+    """Delete every indexed document for a file's relative path."""
+    # Newer Tantivy releases renamed delete_documents and deprecated the old name
+    delete = getattr(writer, "delete_documents_by_term", None)
+    if delete is None:
+        delete = writer.delete_documents
+    delete("path", rel_path)
 
+
+def index_document(
+    writer, collection_dir: str, rel_path: str, metadata: Dict[str, Any]
+) -> bool:
+    """Add or replace a file's document in an open Tantivy writer.
+
+    The file is identified by its path relative to the collection, which the
+    caller has already computed. The caller owns the writer and is
+    responsible for committing it.
+    """
+    try:
         # Create document
         doc = tantivy.Document()  # type: ignore
 
-        # Get relative path as identifier
-        rel_path = os.path.relpath(file_path, collection_dir)
+        # Drop any earlier version of this file so re-indexing never
+        # duplicates it, even if a previous run died before saving its state
+        delete_path_documents(writer, rel_path)
 
         # Add fields to document
         doc.add_text("path", rel_path)
-        doc.add_text("absolute_path", os.path.abspath(file_path))
+        doc.add_text("absolute_path", os.path.join(collection_dir, rel_path))
 
         # Add title if available
         if "title" in metadata and metadata["title"]:
             doc.add_text("title", metadata["title"])
         else:
-            doc.add_text("title", os.path.basename(file_path))
+            doc.add_text("title", os.path.basename(rel_path))
 
         # Add content if available
         if "content" in metadata and metadata["content"]:
             doc.add_text("content", metadata["content"])
 
-        # Add tags as facets if available
+        # Add each tag as a value of the multivalued tags field
         if "tags" in metadata and isinstance(metadata["tags"], list):
             for tag in metadata["tags"]:
                 if tag and isinstance(tag, str):
-                    # Add as text since facets are complicated in Tantivy
-                    tag_field = f"tag_{tag.lower().replace(' ', '_').replace(',', '').replace('-', '_')}"
-                    doc.add_text(tag_field, "true")
-
-        # Store all metadata as JSON
-        doc.add_text(
-            "metadata",
-            json.dumps(
-                {
-                    "path": rel_path,
-                    "absolute_path": os.path.abspath(file_path),
-                    **metadata,
-                }
-            ),
-        )
+                    doc.add_text("tags", tag)
+                    doc.add_text("tag_terms", tag.lower())
 
         # Add document to index
         writer.add_document(doc)
-
-        # Commit changes
-        writer.commit()
         return True
     except Exception as e:
-        sys.stderr.write(f"Error indexing file {file_path}: {e}\n")
+        sys.stderr.write(f"Error indexing file {rel_path}: {e}\n")
         return False
 
 
+@functools.lru_cache(maxsize=None)
+def open_index(index_dir: str):
+    """Open a Tantivy index once per process so repeated searches reuse it."""
+    return tantivy.Index.open(index_dir)  # type: ignore
+
+
+def build_query(index, query_string: str, tag_filter: Optional[str] = None):
+    """Build the Tantivy query for a query string and optional tag filter.
+
+    A tag matches whole tags only, ignoring case. With a tag and an empty
+    query string, every document carrying the tag matches.
+    """
+    if not tag_filter:
+        return index.parse_query(query_string, ["title", "content"])
+
+    # The tag is an exact term on tag_terms, so it matches whole tags only
+    tag_query = tantivy.Query.term_query(  # type: ignore
+        index.schema, "tag_terms", tag_filter.lower()
+    )
+    if not query_string.strip():
+        return tag_query
+
+    # Boosted to 0 so the tag filters results without changing their scores
+    text_query = index.parse_query(query_string, ["title", "content"])
+    tag_query = tantivy.Query.boost_query(tag_query, 0.0)  # type: ignore
+    must = tantivy.Occur.Must  # type: ignore
+    return tantivy.Query.boolean_query([(must, text_query), (must, tag_query)])  # type: ignore
+
+
+def search_collection(
+    collection_dir: str,
+    query_string: str,
+    limit: int,
+    tag_filter: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Search a single collection, returning up to limit results."""
+    results = []
+
+    index_dir = os.path.join(collection_dir, INDEX_DIR)
+    if not os.path.exists(os.path.join(index_dir, "meta.json")):
+        return results
+
+    # An index from before a schema change lacks fields the query may use
+    if not index_schema_matches(index_dir):
+        sys.stderr.write(
+            f"Warning: Skipping collection {collection_dir}: its index is out of date. "
+            "Run 'search index' to rebuild it.\n"
+        )
+        return results
+
+    try:
+        # Reuse the opened index, reloading it to pick up any newer commits
+        index = open_index(index_dir)
+        index.reload()
+        searcher = index.searcher()
+
+        query = build_query(index, query_string, tag_filter)
+
+        # Perform the search
+        search_result = searcher.search(query, limit)
+
+        # Extract results - access the hits property which contains doc_address
+        for hit in search_result.hits:
+            # Unpack score and doc_address from the hit
+            score, doc_address = hit
+            retrieved_doc = searcher.doc(doc_address)
+
+            # Create basic metadata
+            title = ""
+            path = ""
+            abs_path = ""
+            score_value = score * 100  # Convert to percentage
+
+            # Extract fields using get_first
+            title_field = retrieved_doc.get_first("title")
+            if title_field:
+                title = title_field
+
+            path_field = retrieved_doc.get_first("path")
+            if path_field:
+                path = path_field
+
+            abs_path_field = retrieved_doc.get_first("absolute_path")
+            if abs_path_field:
+                abs_path = abs_path_field
+
+            # Tags are stored as separate values of one field
+            tags = retrieved_doc.get_all("tags")
+
+            # Create result object
+            data = {
+                "title": title or os.path.basename(path),
+                "path": path,
+                "absolute_path": abs_path,
+                "tags": tags,
+                "score": score_value,
+                "collection": os.path.basename(collection_dir),
+                "collection_path": collection_dir,
+            }
+
+            results.append(data)
+    except Exception as e:
+        sys.stderr.write(f"Error searching in collection {collection_dir}: {e}\n")
+
+    return results
+
+
 def perform_search(
     query_string: str,
     collections: List[str],
@@ -408,86 +702,27 @@ def perform_search(
     # Check if Tantivy is available
     check_tantivy()
 
-    results = []
-
-    # Process each collection
-    for collection_dir in collections:
-        index_dir = os.path.join(collection_dir, INDEX_DIR)
-        if not os.path.exists(index_dir) or not os.path.exists(
-            os.path.join(index_dir, "meta.json")
-        ):
-            continue
-
-        try:
-            # Open the index
-            index = tantivy.Index.open(index_dir)  # type: ignore
-            searcher = index.searcher()
-
-            # Parse the query using index's parse_query method
-            query = index.parse_query(query_string, ["title", "content"])
-
-            # Perform the search
-            search_result = searcher.search(query, limit)
-
-            # Extract results - access the hits property which contains doc_address
-            for hit in search_result.hits:
-                # Unpack score and doc_address from the hit
-                score, doc_address = hit
-                retrieved_doc = searcher.doc(doc_address)
-
-                # Create basic metadata
-                title = ""
-                path = ""
-                abs_path = ""
-                tags = []
-                score_value = score * 100  # Convert to percentage
-
-                # Extract fields using get_first
-                title_field = retrieved_doc.get_first("title")
-                if title_field:
-                    title = title_field
-
-                path_field = retrieved_doc.get_first("path")
-                if path_field:
-                    path = path_field
-
-                abs_path_field = retrieved_doc.get_first("absolute_path")
-                if abs_path_field:
-                    abs_path = abs_path_field
-
-                metadata_field = retrieved_doc.get_first("metadata")
-                if metadata_field:
-                    try:
-                        metadata = json.loads(metadata_field)
-                        # If we have tags in metadata, extract them
-                        if "tags" in metadata:
-                            tags = metadata["tags"]
-                    except Exception:
-                        pass
-
-                # Skip documents that don't match tag filter
-                if tag_filter and tag_filter.lower() not in [t.lower() for t in tags]:
-                    continue
-
-                # Create result object
-                data = {
-                    "title": title or os.path.basename(path),
-                    "path": path,
-                    "absolute_path": abs_path,
-                    "tags": tags,
-                    "score": score_value,
-                    "collection": os.path.basename(collection_dir),
-                    "collection_path": collection_dir,
-                }
-
-                results.append(data)
-        except Exception as e:
-            sys.stderr.write(f"Error searching in collection {collection_dir}: {e}\n")
-
-    # Sort results by score (highest first)
-    results.sort(key=lambda x: x.get("score", 0), reverse=True)
+    if not collections:
+        return []
+
+    # Search collections concurrently; Tantivy releases the GIL while it
+    # searches, so the total time approaches that of the slowest collection
+    with ThreadPoolExecutor(
+        max_workers=min(len(collections), MAX_SEARCH_WORKERS)
+    ) as executor:
+        collection_results = executor.map(
+            functools.partial(
+                search_collection,
+                query_string=query_string,
+                limit=limit,
+                tag_filter=tag_filter,
+            ),
+            collections,
+        )
+        results = [result for batch in collection_results for result in batch]
 
-    return results[:limit]
+    # Keep the best results by score (highest first) without sorting them all
+    return heapq.nlargest(limit, results, key=lambda x: x.get("score", 0))
 
 
 def cmd_init(args: argparse.Namespace) -> int:
@@ -500,8 +735,8 @@ def cmd_init(args: argparse.Namespace) -> int:
         return 1
 
     # Check if the collection already exists
-    config_path = os.path.join(directory, CONFIG_FILE)
-    if os.path.exists(config_path):
+    config_path = get_config_path(directory)
+    if os.path.isfile(config_path):
         if not args.force:
             sys.stderr.write(
                 f"Error: Collection already exists at {directory}. Use --force to overwrite.\n"
@@ -578,7 +813,7 @@ def cmd_index(args: argparse.Namespace) -> int:
     collections = []
     for directory in directories:
         # Check if the directory is a collection
-        if os.path.exists(os.path.join(directory, CONFIG_FILE)):
+        if os.path.isfile(get_config_path(directory)):
             collections.append(directory)
         else:
             # Scan for collections in this directory
@@ -592,7 +827,9 @@ def cmd_index(args: argparse.Namespace) -> int:
         return 1
 
     indexed_count = 0
+    unchanged_count = 0
     failed_count = 0
+    jobs = args.jobs or os.cpu_count() or 1
 
     for collection_dir in collections:
         config = load_config(collection_dir)
@@ -609,10 +846,24 @@ def cmd_index(args: argparse.Namespace) -> int:
         matched_files = filter_files(collection_dir, config)
         print(f"Found {len(matched_files)} matching files")
 
-        for file_path in matched_files:
-            rel_path = os.path.relpath(file_path, collection_dir)
+        # Open the index once and stream every document through one writer
+        index, _schema = get_or_create_index(collection_dir)
+        writer = index.writer(heap_size=WRITER_HEAP_SIZE)
+        pending_count = 0
+
+        # Files whose mtime, size and extractor match the last successful run
+        # are skipped
+        state = load_index_state(collection_dir)
+        seen_paths = set()
+
+        # Extractors are external commands, so run several at once and keep
+        # the Tantivy writer on this thread, consuming results in file order
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            pending = deque()
+            to_extract = []
+            for file_path in matched_files:
+                rel_path = os.path.relpath(file_path, collection_dir)
 
-            try:
                 # Get the appropriate extractor
                 extractor = get_extractor(os.path.basename(file_path), config)
                 if not extractor:
@@ -620,37 +871,139 @@ def cmd_index(args: argparse.Namespace) -> int:
                         print(f"  Skipping {rel_path}: No extractor found")
                     continue
 
-                if args.verbose:
-                    print(f"  Extracting {rel_path}")
-
-                # Extract metadata
-                metadata = extract_metadata(file_path, extractor)
-                if not metadata:
-                    if args.verbose:
-                        print(f"  Failed to extract metadata from {rel_path}")
+                try:
+                    stat_result = os.stat(file_path)
+                except OSError as e:
+                    sys.stderr.write(f"Error processing {rel_path}: {e}\n")
                     failed_count += 1
                     continue
 
-                # Save to cache if caching is enabled
-                if not args.no_cache:
-                    save_cache(collection_dir, file_path, metadata, config)
-
-                # Index the file
-                if index_file(collection_dir, file_path, metadata):
-                    indexed_count += 1
+                seen_paths.add(rel_path)
+                # The extractor is part of the signature so that changing it
+                # in the config re-extracts the files it handles
+                signature = [stat_result.st_mtime_ns, stat_result.st_size, extractor]
+                if not args.force and state.get(rel_path) == signature:
+                    unchanged_count += 1
                     if args.verbose:
-                        print(f"  Successfully indexed {rel_path}")
-                else:
+                        print(f"  Skipping {rel_path}: Unchanged")
+                    continue
+
+                # A cache entry with the same signature means the extractor
+                # already ran on this version, e.g. before an interrupted run
+                cached = None
+                if not args.force and not args.no_cache:
+                    cached = load_cache(collection_dir, rel_path, signature)
+                # Entries are lists so the extraction job can be filled in
+                # once files are grouped into batches below
+                entry = [file_path, rel_path, signature, cached, None]
+                pending.append(entry)
+                if not cached:
+                    to_extract.append((extractor, entry))
+
+            # Built-in extractors take several files per process, which saves
+            # an interpreter start per file; batches stay small enough that
+            # every worker gets a share. Other extractors run once per file.
+            batch_sizes = {
+                extractor: min(EXTRACTOR_BATCH_SIZE, -(-count // jobs))
+                if is_batch_extractor(extractor)
+                else 1
+                for extractor, count in Counter(e for e, _ in to_extract).items()
+            }
+            # Batches are listed in the order of their first file, which is
+            # the order the consumer below needs them in
+            batches = []
+            open_batches = {}
+            for extractor, entry in to_extract:
+                batch_index = open_batches.get(extractor)
+                if batch_index is None:
+                    batch_index = open_batches[extractor] = len(batches)
+                    batches.append((extractor, []))
+                batch_files = batches[batch_index][1]
+                entry[4] = (batch_index, len(batch_files))
+                batch_files.append(entry[0])
+                if len(batch_files) == batch_sizes[extractor]:
+                    del open_batches[extractor]
+
+            # Only a few batches are submitted ahead of the consumer, so
+            # finished results waiting on an earlier file can't pile up in
+            # memory; a batch's results are dropped once all its files are used
+            futures = {}
+            remaining = [len(batch_files) for _, batch_files in batches]
+            submitted = 0
+            while pending:
+                file_path, rel_path, signature, cached, job = pending.popleft()
+
+                needed = job[0] + 1 if job is not None else 0
+                while submitted < len(batches) and (
+                    submitted < needed or len(futures) < 2 * jobs
+                ):
+                    extractor, batch_files = batches[submitted]
+                    futures[submitted] = executor.submit(
+                        extract_metadata_batch, batch_files, extractor
+                    )
+                    submitted += 1
+
+                try:
+                    if job is None:
+                        if args.verbose:
+                            print(f"  Using cached metadata for {rel_path}")
+                        metadata = cached
+                    else:
+                        if args.verbose:
+                            print(f"  Extracting {rel_path}")
+
+                        # Extract metadata
+                        batch_index, position = job
+                        future = futures[batch_index]
+                        remaining[batch_index] -= 1
+                        if not remaining[batch_index]:
+                            del futures[batch_index]
+                        metadata = future.result()[position]
+                    if not metadata:
+                        if args.verbose:
+                            print(f"  Failed to extract metadata from {rel_path}")
+                        failed_count += 1
+                        continue
+
+                    # Save to cache if caching is enabled
+                    if not args.no_cache and job is not None:
+                        save_cache(collection_dir, rel_path, signature, metadata)
+
+                    # Index the file
+                    if index_document(writer, collection_dir, rel_path, metadata):
+                        state[rel_path] = signature
+                        indexed_count += 1
+                        pending_count += 1
+                        if args.verbose:
+                            print(f"  Successfully indexed {rel_path}")
+                    else:
+                        failed_count += 1
+                        if args.verbose:
+                            print(f"  Failed to index {rel_path}")
+
+                    if pending_count >= COMMIT_INTERVAL:
+                        writer.commit()
+                        pending_count = 0
+                except Exception as e:
+                    sys.stderr.write(f"Error processing {rel_path}: {e}\n")
                     failed_count += 1
-                    if args.verbose:
-                        print(f"  Failed to index {rel_path}")
-            except Exception as e:
-                sys.stderr.write(f"Error processing {rel_path}: {e}\n")
-                failed_count += 1
+
+        # Remove documents for files that were deleted or are no longer matched
+        for rel_path in [p for p in state if p not in seen_paths]:
+            delete_path_documents(writer, rel_path)
+            del state[rel_path]
+            if args.verbose:
+                print(f"  Removed {rel_path} from the index")
+
+        # Commit whatever is left in a single batch
+        writer.commit()
+        save_index_state(collection_dir, state)
 
     print(
         f"Finished indexing {indexed_count} files across {len(collections)} collections."
     )
+    if unchanged_count > 0:
+        print(f"Skipped {unchanged_count} unchanged files.")
     if failed_count > 0:
         print(f"Failed to index {failed_count} files.")
 
@@ -666,7 +1019,7 @@ def cmd_query(args: argparse.Namespace) -> int:
     collections = []
     if args.in_dir:
         directory = os.path.abspath(args.in_dir)
-        if os.path.exists(os.path.join(directory, CONFIG_FILE)):
+        if os.path.isfile(get_config_path(directory)):
             collections.append(directory)
         else:
             sys.stderr.write(f"Error: {directory} is not a valid search collection.\n")
@@ -675,7 +1028,7 @@ def cmd_query(args: argparse.Namespace) -> int:
         # Start from current directory, search up to find collections
         dir_path = os.path.abspath(os.getcwd())
         while dir_path and dir_path != "/":
-            if os.path.exists(os.path.join(dir_path, CONFIG_FILE)):
+            if os.path.isfile(get_config_path(dir_path)):
                 collections.append(dir_path)
                 break
             dir_path = os.path.dirname(dir_path)
@@ -718,10 +1071,12 @@ def cmd_query(args: argparse.Namespace) -> int:
         if tags:
             print(f"   Tags: {', '.join(tags)}")
 
-        # Show a snippet of content if available and detailed output is requested
-        if args.verbose and "content" in result:
-            content = result["content"]
-            if content:
+        # Show a snippet of content if available and detailed output is requested.
+        # Content is indexed but not stored, so it comes from the cache.
+        if args.verbose:
+            cached = load_cache(result["collection_path"], result["path"])
+            content = cached.get("content") if cached else None
+            if content and isinstance(content, str):
                 # Truncate and sanitize for display
                 content = re.sub(r"\s+", " ", content)
                 snippet = content[:200] + ("..." if len(content) > 200 else "")
@@ -730,6 +1085,17 @@ def cmd_query(args: argparse.Namespace) -> int:
     return 0
 
 
+def positive_int(value: str) -> int:
+    """Parse a command-line argument as an integer of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main() -> int:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -737,8 +1103,6 @@ def main() -> int:
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=__doc__.split("\n\n", 1)[1]
         if __doc__
-        else ""
-        if __doc__
         else "",  # Use the docstring as extended help
     )
     parser.add_argument("--version", action="version", version="search 1.0.0")
@@ -792,7 +1156,19 @@ def main() -> int:
         "--verbose", action="store_true", help="Show detailed progress"
     )
     index_parser.add_argument(
-        "--no-cache", action="store_true", help="Skip caching extracted metadata"
+        "--no-cache",
+        action="store_true",
+        help="Skip reading and writing cached extracted metadata",
+    )
+    index_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-extract and re-index files even if they are unchanged",
+    )
+    index_parser.add_argument(
+        "--jobs",
+        type=positive_int,
+        help="Number of extractors to run in parallel (default: number of CPUs)",
     )
 
     # query command
@@ -74,6 +74,8 @@ def index_collections():
         directories = [DOCS_DIR, PAPERS_DIR]
         verbose = True
         no_cache = False
+        force = False
+        jobs = None
 
     search.cmd_index(IndexArgs())  # type: ignore
 
@@ -8,6 +8,7 @@ import sys
 import tempfile
 import unittest
 import shutil
+from unittest import mock
 
 # Add parent directory to path so we can import the search module
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -191,6 +192,29 @@ class TestSearchFileMatching(unittest.TestCase):
             matched_files,
         )
 
+    def test_filter_files_prunes_excluded_directories(self):
+        """Test that excluded directories are skipped without hiding their siblings."""
+        git_dir = os.path.join(self.test_dir, ".git")
+        os.makedirs(git_dir)
+        with open(os.path.join(git_dir, "HEAD.txt"), "w") as f:
+            f.write("ref: refs/heads/main")
+
+        config = {
+            "include": {"patterns": ["*.pdf", "*.md", "*.txt"]},
+            "exclude": {"patterns": ["nested", ".git/*"]},
+        }
+
+        matched_files = search.filter_files(self.test_dir, config)
+        matched_files = [os.path.normpath(p) for p in matched_files]
+
+        self.assertEqual(
+            sorted(matched_files),
+            sorted(
+                os.path.normpath(os.path.join(self.test_dir, name))
+                for name in ["document.pdf", "notes.md", "draft_document.pdf"]
+            ),
+        )
+
 
 class TestSearchExtractor(unittest.TestCase):
     """Test extractor functionality."""
@@ -222,5 +246,230 @@ class TestSearchExtractor(unittest.TestCase):
         self.assertIsNone(extractor)
 
 
+class TestSearchExtractMetadataBatch(unittest.TestCase):
+    """Test extracting several files with one extractor run."""
+
+    def setUp(self):
+        """Create input files and a fake batch-capable extractor."""
+        self.test_dir = tempfile.mkdtemp()
+        self.files = []
+        for name in ["a.txt", "b.txt"]:
+            path = os.path.join(self.test_dir, name)
+            with open(path, "w") as f:
+                f.write(name)
+            self.files.append(path)
+
+        # Named like a built-in extractor so it is treated as batch-capable.
+        # A --jsonl run logs its arguments and prints lines_per_batch lines.
+        self.log_path = os.path.join(self.test_dir, "calls.log")
+        self.extractor = os.path.join(self.test_dir, "text-extractor")
+        with open(self.extractor, "w") as f:
+            f.write(
+                "#!/bin/sh\n"
+                f'echo "$@" >> "{self.log_path}"\n'
+                'if [ "$1" = "--jsonl" ]; then\n'
+                "  i=0\n"
+                '  while [ "$i" -lt "$LINES_PER_BATCH" ]; do\n'
+                '    echo \'{"title": "batch"}\'; i=$((i + 1))\n'
+                "  done\n"
+                "  exit 0\n"
+                "fi\n"
+                'printf \'{"title": "%s"}\\n\' "$(basename "$1")"\n'
+            )
+        os.chmod(self.extractor, 0o755)
+
+    def tearDown(self):
+        """Remove the temporary directory after testing."""
+        shutil.rmtree(self.test_dir)
+        os.environ.pop("LINES_PER_BATCH", None)
+
+    def extract(self, lines_per_batch):
+        os.environ["LINES_PER_BATCH"] = str(lines_per_batch)
+        return search.extract_metadata_batch(self.files, f"{self.extractor} {{input}}")
+
+    def calls(self):
+        with open(self.log_path) as f:
+            return f.read().splitlines()
+
+    def test_batch_run_returns_one_result_per_file(self):
+        """Test that a batch extractor runs once with --jsonl for all files."""
+        results = self.extract(lines_per_batch=2)
+
+        self.assertEqual(results, [{"title": "batch"}, {"title": "batch"}])
+        self.assertEqual(self.calls(), [f"--jsonl {' '.join(self.files)}"])
+
+    def test_line_count_mismatch_falls_back_to_single_files(self):
+        """Test that each file is retried alone when the batch output is short."""
+        results = self.extract(lines_per_batch=1)
+
+        self.assertEqual(results, [{"title": "a.txt"}, {"title": "b.txt"}])
+        self.assertEqual(self.calls()[1:], self.files)
+
+
+class TestSearchIndexState(unittest.TestCase):
+    """Test the incremental indexing state."""
+
+    def setUp(self):
+        """Create a temporary directory for testing."""
+        self.test_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.test_dir, search.INDEX_DIR))
+
+    def tearDown(self):
+        """Remove the temporary directory after testing."""
+        shutil.rmtree(self.test_dir)
+
+    def test_index_state_round_trip(self):
+        """Test that saved index state loads back unchanged."""
+        # A collection that was never indexed has no state
+        self.assertEqual(search.load_index_state(self.test_dir), {})
+
+        state = {"notes.md": [1700000000000000000, 42, "text-extractor {input}"]}
+        self.assertTrue(search.save_index_state(self.test_dir, state))
+        self.assertEqual(search.load_index_state(self.test_dir), state)
+
+    def test_changed_extractor_reindexes(self):
+        """Test that unchanged files are re-extracted when their extractor changes."""
+
+        class Args:
+            directories = [self.test_dir]
+            verbose = False
+            no_cache = False
+            force = False
+            jobs = 1
+
+        with open(os.path.join(self.test_dir, "notes.md"), "w") as f:
+            f.write("unused")
+        config = {"name": "Test", "include": {"patterns": ["*.md"]}}
+
+        for word in ["first", "second"]:
+            config["extractors"] = {"*.md": f"echo {word} {{input}}"}
+            search.save_config(self.test_dir, config)
+            self.assertEqual(search.cmd_index(Args()), 0)  # type: ignore
+
+        self.assertEqual(search.perform_search("first", [self.test_dir]), [])
+        results = search.perform_search("second", [self.test_dir])
+        self.assertEqual([result["path"] for result in results], ["notes.md"])
+
+    def test_extraction_runs_a_bounded_window_ahead(self):
+        """Test that batches are only submitted a few files ahead of indexing."""
+
+        class Args:
+            directories = [self.test_dir]
+            verbose = False
+            no_cache = True
+            force = False
+            jobs = 1
+
+        names = [f"{i}.md" for i in range(8)]
+        for name in names:
+            with open(os.path.join(self.test_dir, name), "w") as f:
+                f.write(name)
+        config = {"name": "Test", "include": {"patterns": ["*.md"]}}
+        config["extractors"] = {"*.md": "echo {input}"}
+        search.save_config(self.test_dir, config)
+
+        events = []
+        index_document = search.index_document
+
+        class RecordingExecutor(search.ThreadPoolExecutor):
+            def submit(self, fn, /, *args, **kwargs):
+                events.extend(("submit", os.path.basename(p)) for p in args[0])
+                return super().submit(fn, *args, **kwargs)
+
+        def record_index(writer, collection_dir, rel_path, metadata):
+            events.append(("index", rel_path))
+            return index_document(writer, collection_dir, rel_path, metadata)
+
+        with (
+            mock.patch.object(search, "ThreadPoolExecutor", RecordingExecutor),
+            mock.patch.object(search, "index_document", record_index),
+        ):
+            self.assertEqual(search.cmd_index(Args()), 0)  # type: ignore
+
+        # With one job, two batches run ahead: the fourth file's batch is only
+        # submitted once the first two files have been indexed
+        order = sorted(names, key=lambda name: events.index(("index", name)))
+        self.assertGreater(
+            events.index(("submit", order[3])), events.index(("index", order[1]))
+        )
+
+
+class TestSearchTagFilter(unittest.TestCase):
+    """Test filtering query results by tag."""
+
+    def setUp(self):
+        """Index a few tagged documents in a temporary collection."""
+        self.test_dir = tempfile.mkdtemp()
+        index, _schema = search.get_or_create_index(self.test_dir)
+        writer = index.writer()
+        documents = {
+            "one.md": ["pdf report"],
+            "two.md": ["PDF"],
+            "three.md": ["report"],
+        }
+        for rel_path, tags in documents.items():
+            metadata = {"title": rel_path, "content": "alpha notes", "tags": tags}
+            search.index_document(writer, self.test_dir, rel_path, metadata)
+        writer.commit()
+
+    def tearDown(self):
+        """Remove the temporary directory after testing."""
+        shutil.rmtree(self.test_dir)
+
+    def search_paths(self, query, tag):
+        results = search.perform_search(query, [self.test_dir], tag_filter=tag)
+        return sorted(result["path"] for result in results)
+
+    def test_tag_matches_whole_tags_ignoring_case(self):
+        """Test that a tag only matches documents carrying that exact tag."""
+        self.assertEqual(self.search_paths("alpha", "pdf"), ["two.md"])
+        self.assertEqual(self.search_paths("alpha", "Report"), ["three.md"])
+        self.assertEqual(self.search_paths("alpha", "pdf report"), ["one.md"])
+        self.assertEqual(self.search_paths("alpha", "missing"), [])
+
+    def test_tag_with_empty_query(self):
+        """Test that an empty query with a tag returns every tagged document."""
+        self.assertEqual(self.search_paths("", "report"), ["three.md"])
+
+
+class TestSearchCache(unittest.TestCase):
+    """Test the extracted metadata cache."""
+
+    def setUp(self):
+        """Create a temporary directory for testing."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory after testing."""
+        shutil.rmtree(self.test_dir)
+
+    def test_cache_entries_are_per_path(self):
+        """Test that paths differing only by separators get separate entries."""
+        search.save_cache(self.test_dir, "a/b.md", [1, 10, "x"], {"content": "nested"})
+        search.save_cache(self.test_dir, "a_b.md", [2, 20, "x"], {"content": "flat"})
+
+        self.assertEqual(
+            search.load_cache(self.test_dir, "a/b.md", [1, 10, "x"]),
+            {"content": "nested"},
+        )
+        self.assertEqual(
+            search.load_cache(self.test_dir, "a_b.md", [2, 20, "x"]),
+            {"content": "flat"},
+        )
+
+    def test_cache_requires_matching_signature(self):
+        """Test that an entry saved for another mtime, size or extractor is not reused."""
+        search.save_cache(self.test_dir, "notes.md", [100, 10, "x"], {"content": "new"})
+
+        # An older mtime, as left by cp -p or tar x, must not match either
+        self.assertIsNone(search.load_cache(self.test_dir, "notes.md", [50, 10, "x"]))
+        self.assertIsNone(search.load_cache(self.test_dir, "notes.md", [100, 11, "x"]))
+        self.assertIsNone(search.load_cache(self.test_dir, "notes.md", [100, 10, "y"]))
+        self.assertIsNone(search.load_cache(self.test_dir, "other.md", [100, 10, "x"]))
+        self.assertEqual(
+            search.load_cache(self.test_dir, "notes.md"), {"content": "new"}
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
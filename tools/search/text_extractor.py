@@ -5,26 +5,49 @@ text-extractor: Extract content and metadata from text files
 Reads a text file and outputs a JSON object containing the file's content
 and metadata including filename, size, creation and modification times.
 
-Usage: text-extractor [options] [FILE]
+Usage: text-extractor [options] [FILE...]
 
 Examples:
   text-extractor document.txt           # Extract from a text file
   cat file.txt | text-extractor         # Read from stdin
+  text-extractor a.txt b.md             # One JSON object per line, per file
 """
 
 import sys
 import os
-import json
 import argparse
+import functools
 from datetime import datetime
 import mimetypes
-from pathlib import Path
 
+import orjson
 
-def get_file_metadata(file_path):
-    """Get file metadata including creation time, modification time, size, etc."""
-    path = Path(file_path)
-    stat = path.stat()
+try:
+    from tools.search.extractor_batch import write_jsonl
+except ImportError:  # Run as a script from tools/search
+    from extractor_batch import write_jsonl  # type: ignore
+
+
+@functools.lru_cache(maxsize=None)
+def guess_mime_type(extension):
+    """Return the mime type for a file extension such as ".md".
+
+    The guess depends only on the extension, so it is cached per extension
+    when many files are extracted in one run.
+    """
+    mime_type, _ = mimetypes.guess_type(f"file{extension}")
+    return mime_type or "text/plain"  # Default to plain text
+
+
+def get_file_metadata(file_path, stat_result=None):
+    """Get file metadata including creation time, modification time, size, etc.
+
+    Callers that already hold an os.stat_result (e.g. from an open file) can
+    pass it as stat_result to avoid a second stat() call.
+    """
+    stat = stat_result if stat_result is not None else os.stat(file_path)
+    name = os.path.basename(file_path)
+    suffix = os.path.splitext(name)[1]
 
     # Get file modification and creation times
     mtime = datetime.fromtimestamp(stat.st_mtime).isoformat()
@@ -33,36 +56,41 @@ def get_file_metadata(file_path):
     except Exception:
         ctime = mtime  # Fallback if creation time not available
 
-    # Get mime type
-    mime_type, _ = mimetypes.guess_type(file_path)
-    if not mime_type:
-        mime_type = "text/plain"  # Default to plain text
-
     return {
-        "filename": path.name,
-        "path": str(path.absolute()),
+        "filename": name,
+        "path": os.path.abspath(file_path),
         "size": stat.st_size,
         "created_at": ctime,
         "modified_at": mtime,
-        "mime_type": mime_type,
-        "extension": path.suffix.lstrip(".") if path.suffix else "",
+        "mime_type": guess_mime_type(suffix),
+        "extension": suffix.lstrip("."),
     }
 
 
 def process_file(file_path):
     """Extract content and metadata from the file."""
     # Get file metadata
-    if file_path and os.path.exists(file_path):
-        metadata = get_file_metadata(file_path)
+    if file_path and file_path != "-":
+        # Read the raw bytes once, sized from fstat, and decode in memory so
+        # the latin-1 fallback doesn't need a second read of the file
+        try:
+            with open(file_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                raw = f.read()
+        except FileNotFoundError:
+            sys.stderr.write(f"Error: File '{file_path}' not found.\n")
+            return {}
+
+        metadata = get_file_metadata(file_path, stat)
 
-        # Read file content
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            content = raw.decode("utf-8")
         except UnicodeDecodeError:
             # Try again with latin-1 encoding
-            with open(file_path, "r", encoding="latin-1") as f:
-                content = f.read()
+            content = raw.decode("latin-1")
+        # Match the newline translation of a text-mode read
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
     else:
         # Reading from stdin
         content = sys.stdin.read()
@@ -95,18 +123,32 @@ def main():
         if __doc__
         else "",  # Use the docstring as extended help
     )
-    parser.add_argument("file", nargs="?", help="Input file (default: stdin)")
+    parser.add_argument(
+        "files", nargs="*", metavar="FILE", help="Input file(s) (default: stdin)"
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Write one compact JSON object per line, one per file (implied by several files)",
+    )
     parser.add_argument(
         "-v", "--version", action="version", version="text-extractor 1.0.0"
     )
     args = parser.parse_args()
 
+    if args.jsonl and not args.files:
+        parser.error("--jsonl needs at least one FILE")
+    if args.jsonl or len(args.files) > 1:
+        return write_jsonl(args.files, process_file)
+
     try:
         # Process the file
-        result = process_file(args.file)
+        result = process_file(args.files[0] if args.files else None)
 
-        # Output the result as JSON
-        print(json.dumps(result, indent=2))
+        # Output the result as JSON, encoded straight to UTF-8 bytes so a
+        # large content string isn't copied through an intermediate str
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b"\n")
 
         return 0
     except Exception as e:
@@ -17,6 +17,7 @@ Examples:
 import sys
 import os
 import json
+import re
 import argparse
 import subprocess
 import datetime
@@ -26,6 +27,8 @@ import logging
 DEFAULT_CONFIG_DIR = os.path.expanduser("~/.config/toolkit")
 DEFAULT_CONFIG_FILE = os.path.join(DEFAULT_CONFIG_DIR, "backup-config.json")
 DEFAULT_BACKUP_DIR = os.environ.get("DBACKUP", "/data/backup")
+# Matches the date_str suffix of dated backup directories (see main)
+BACKUP_DATE_PATTERN = r"\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}"
 
 # Setup logging
 logging.basicConfig(
@@ -68,14 +71,13 @@ def create_default_config(config_path):
 
 def load_config(config_path):
     """Load the configuration file or create default if it doesn't exist."""
-    if not os.path.exists(config_path):
-        return create_default_config(config_path)
-
     try:
         with open(config_path, "r") as f:
             config = json.load(f)
         logger.info(f"Loaded configuration from {config_path}")
         return config
+    except FileNotFoundError:
+        return create_default_config(config_path)
     except Exception as e:
         logger.error(f"Error loading configuration: {e}")
         logger.info("Using default configuration")
@@ -173,22 +175,21 @@ def cleanup_old_backups(source, backup_dir, retention):
     logger.info(f"Cleaning up old backups for {source_name}")
 
     try:
-        # Find all dated backups for this source
-        backups = sorted(
-            [
-                d
-                for d in os.listdir(backup_dir)
-                if os.path.isdir(os.path.join(backup_dir, d))
-                and d.startswith(f"{source_name}-")
-                and not os.path.islink(os.path.join(backup_dir, d))
-            ]
-        )
+        # Match the full name so source "config" can't claim "config-old-..." backups.
+        is_dated_backup = re.compile(
+            f"{re.escape(source_name)}-{BACKUP_DATE_PATTERN}"
+        ).fullmatch
+        with os.scandir(backup_dir) as entries:
+            backups = sorted(
+                entry.path
+                for entry in entries
+                if is_dated_backup(entry.name) and entry.is_dir(follow_symlinks=False)
+            )
 
         # Keep only the most recent 'retention' number of backups
         if len(backups) > retention:
             to_delete = backups[:-retention]
-            for backup in to_delete:
-                backup_path = os.path.join(backup_dir, backup)
+            for backup_path in to_delete:
                 logger.info(f"Removing old backup: {backup_path}")
                 # Use subprocess to remove directories that might have read-only files
                 subprocess.run(["rm", "-rf", backup_path], check=True)